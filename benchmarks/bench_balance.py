@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""Load balancing benchmark for the parallel JuliaPlane refresh.
+
+Run from the top of the repository with
+    python -m benchmarks.bench_balance --size 2000 --max 2000 --threads 8
+
+The plane for c = -0.835-0.2321j is computed over a window near the edge of the set, where
+a few rows cost far more than the rest, with each of the static, dynamic and balanced
+schedules.  Each result is checked against the single core plane.
+
+Wall-clock times only show the tail once there are cores for the threads to run on, so the
+benchmark also works out, from the loops each row actually needs, how long the slowest of
+--threads threads would take under each schedule, as a multiple of a perfect split of the
+work.  1.00 means no thread is left running on its own at the end.  The balanced figure
+includes the coarse sample it computes first to estimate the cost of each row.
+"""
+
+import argparse
+import heapq
+import time
+
+import numba as nb
+import numpy as np
+
+import cplane_np as jp
+
+
+def static_tail(cost, threads):
+    """Return the largest share of the row costs given to a thread when the rows are split into equal blocks."""
+    block = -( -len( cost ) // threads )
+    return max( cost[ k*block:( k + 1 )*block ].sum() for k in range( threads ) )
+
+
+def dynamic_tail(cost, order, threads):
+    """Return the largest share of the row costs given to a thread when each row, taken in order, goes to
+    whichever thread is free first."""
+    finish = [ 0. ]*threads
+    for row in order:
+        heapq.heappush( finish, heapq.heappop( finish ) + cost[ row ] )
+    return max( finish )
+
+
+def main():
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--size', type=int, default=2000, help='points along each axis' )
+    parser.add_argument( '--max', type=int, default=2000, help='maximum loop count' )
+    parser.add_argument( '--window', type=float, nargs=4, default=[ -1., 0., 0., 0.8 ], help='xmin xmax ymin ymax' )
+    parser.add_argument( '--threads', type=int, default=nb.config.NUMBA_NUM_THREADS, help='threads to use' )
+    parser.add_argument( '--repeat', type=int, default=3, help='refreshes timed per schedule, best is reported' )
+    args = parser.parse_args()
+
+    c = complex( -0.835, -0.2321 )
+    xmin, xmax, ymin, ymax = args.window
+    reference = jp.JuliaPlane( xmin, xmax, args.size, ymin, ymax, args.size, c, args.max ).plane
+    rx = np.linspace( xmin, xmax, args.size )
+    ry = np.linspace( ymin, ymax, args.size )
+    #  the loops each row needs, counted the same way as the cost estimate counts them
+    cost = np.where( reference == 0, args.max, reference.astype( np.int64 ) + 1 ).sum( axis=1 ).astype( float )
+    perfect = cost.sum()/args.threads
+    #  the sample behind the balanced order is every _COST_STEP-th point of the plane, its rows handed out dynamically too
+    sample = reference[ ::jp._COST_STEP, ::jp._COST_STEP ]
+    sampleCost = np.where( sample == 0, args.max, sample.astype( np.int64 ) + 1 ).sum( axis=1 ).astype( float )
+    estimate = dynamic_tail( sampleCost, range( len( sampleCost ) ), args.threads )
+    tails = { 'static':static_tail( cost, args.threads ), 'dynamic':dynamic_tail( cost, range( len( cost ) ), args.threads ),
+              'balanced':estimate + dynamic_tail( cost, jp._row_order( rx, ry, c, args.max ), args.threads ) }
+
+    print( '%10s %10s %10s %10s' % ( 'schedule', 'seconds', 'tail', 'identical' ) )
+    for schedule in jp._SCHEDULES:
+        plane = jp.JuliaPlane( xmin, xmax, args.size, ymin, ymax, args.size, c, args.max, workers=args.threads, schedule=schedule, deferred=True )
+        plane.refresh()     # warm up, and compile the kernels the first time through
+        best = None
+        for _ in range( args.repeat ):
+            start = time.perf_counter()
+            plane.refresh()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min( best, elapsed )
+        identical = np.array_equal( plane.plane, reference )
+        print( '%10s %10.3f %10.2f %10s' % ( schedule, best, tails[ schedule ]/perfect, identical ) )
+
+
+if __name__ == '__main__':
+    main()
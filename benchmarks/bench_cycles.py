@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""Benchmark for periodicity checking in the escape-time kernel.
+
+Run from the top of the repository with
+    python -m benchmarks.bench_cycles --size 1000 --max 1000 5000
+
+Each window is refreshed with and without cycles=True, and the two planes are checked
+to be identical.  The interior-heavy window is the middle of the Douady rabbit, where
+almost every point is inside the set and runs to the maximum loop count without the
+check; the exterior window is there to show what the check costs when it cannot help.
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import cplane_np as jp
+
+
+#  name, constant, and window (xmin, xmax, ymin, ymax)
+WINDOWS = [
+    ( 'interior', complex( -0.123, 0.745 ), ( -0.5, 0.5, -0.5, 0.5 ) ),
+    ( 'mixed', complex( -0.8, 0.156 ), ( -1.6, 1.6, -1.0, 1.0 ) ),
+    ( 'exterior', complex( -0.8, 0.156 ), ( -2.0, 2.0, 1.0, 2.0 ) ),
+]
+
+
+def best_refresh(plane, repeat):
+    """Return the best time in seconds of repeat refreshes of plane."""
+    best = None
+    for _ in range( repeat ):
+        start = time.perf_counter()
+        plane.refresh()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min( best, elapsed )
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--size', type=int, default=1000, help='points along each axis' )
+    parser.add_argument( '--max', type=int, nargs='+', default=[ 1000, 5000 ], help='maximum loop counts to try' )
+    parser.add_argument( '--repeat', type=int, default=3, help='refreshes timed per case, best is reported' )
+    args = parser.parse_args()
+
+    print( '%-10s %6s %10s %10s %8s %10s' % ( 'window', 'max', 'plain', 'cycles', 'speedup', 'identical' ) )
+    for name, c, ( xmin, xmax, ymin, ymax ) in WINDOWS:
+        for maxLoop in args.max:
+            plain = jp.JuliaPlane( xmin, xmax, args.size, ymin, ymax, args.size, c, maxLoop )
+            checked = jp.JuliaPlane( xmin, xmax, args.size, ymin, ymax, args.size, c, maxLoop, cycles=True )
+            plainSeconds = best_refresh( plain, args.repeat )
+            checkedSeconds = best_refresh( checked, args.repeat )
+            identical = np.array_equal( plain.plane, checked.plane )
+            print( '%-10s %6d %10.3f %10.3f %8.2f %10s' % ( name, maxLoop, plainSeconds, checkedSeconds, plainSeconds/checkedSeconds, identical ) )
+
+
+if __name__ == '__main__':
+    main()
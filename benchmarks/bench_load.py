@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+"""Load test for the julia tile server.
+
+Run from the top of the repository with
+    python -m benchmarks.bench_load --clients 16 --requests 2000
+to start a server on a free local port and load it, or point it at a server that is
+already running with --port.
+
+Each client keeps one connection open and asks for tiles one after another, picked at
+random from the tiles of a few zoom levels, so that some requests repeat tiles that are
+cached or still being computed.  At the end the throughput and the latency percentiles
+are reported, along with the server's own counters.  Before the timing starts, every
+worker process is given one small tile to compute, so that loading the compiled kernels
+is not counted as latency.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import julia_server
+
+
+async def fetch(reader, writer, target):
+    """Send one GET request on an open connection and return the status and body of the reply."""
+    writer.write( ( 'GET %s HTTP/1.1\r\nHost: localhost\r\n\r\n' % target ).encode( 'latin-1' ) )
+    await writer.drain()
+    status = int( ( await reader.readline() ).split()[1] )
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in ( b'\r\n', b'' ):
+            break
+        name, _, value = header.decode( 'latin-1' ).partition( ':' )
+        if name.strip().lower() == 'content-length':
+            length = int( value )
+    return status, await reader.readexactly( length )
+
+
+def targets(zooms, maxLoop, size, kind):
+    """Return the URL of every tile at the given zoom levels."""
+    return [ '/tiles/%d/%d/%d.%s?cr=-0.8&ci=0.156&max=%d&size=%d' % ( z, x, y, kind, maxLoop, size )
+             for z in zooms for x in range( 2**z ) for y in range( 2**z ) ]
+
+
+async def client(port, urls, count, latencies, failures):
+    """Make count requests for tiles chosen at random from urls, recording the latency of each one."""
+    reader, writer = await asyncio.open_connection( '127.0.0.1', port )
+    try:
+        for _ in range( count ):
+            start = time.perf_counter()
+            status, body = await fetch( reader, writer, random.choice( urls ) )
+            latencies.append( time.perf_counter() - start )
+            if status != 200:
+                failures.append( status )
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def warm_up(port, workers):
+    """Ask for workers small tiles that are never used again, all at once, so every worker process has loaded
+    the compiled kernels before the timing starts."""
+    async def one(size):
+        reader, writer = await asyncio.open_connection( '127.0.0.1', port )
+        await fetch( reader, writer, '/tiles/0/0/0.raw?size=%d' % size )
+        writer.close()
+        await writer.wait_closed()
+    await asyncio.gather( *[ one( 8 + n ) for n in range( workers ) ] )
+
+
+def percentile(values, fraction):
+    """Return the value below which the given fraction of the sorted values lie."""
+    return values[ min( len( values ) - 1, int( fraction*len( values ) ) ) ]
+
+
+async def run(args):
+    server = None
+    port = args.port
+    if port is None:
+        tiles = julia_server.TileServer( workers=args.workers )
+        server = await tiles.start( '127.0.0.1', 0 )
+        port = server.sockets[0].getsockname()[1]
+
+    await warm_up( port, args.workers or os.cpu_count() )
+    urls = targets( args.zooms, args.max, args.size, args.kind )
+    latencies = []
+    failures = []
+    perClient = args.requests // args.clients
+    start = time.perf_counter()
+    await asyncio.gather( *[ client( port, urls, perClient, latencies, failures ) for _ in range( args.clients ) ] )
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection( '127.0.0.1', port )
+    status, body = await fetch( reader, writer, '/stats' )
+    writer.close()
+    await writer.wait_closed()
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+        #  the clients have closed their connections, so let the server finish with them before shutting it down
+        await asyncio.gather( *tiles.connections )
+        tiles.close()
+
+    latencies.sort()
+    print( 'requests     %d (%d failed) from %d clients' % ( len( latencies ), len( failures ), args.clients ) )
+    print( 'throughput   %.1f requests/s' % ( len( latencies )/elapsed ) )
+    print( 'latency      p50 %.1f ms   p90 %.1f ms   p99 %.1f ms   max %.1f ms' % tuple(
+        1000*value for value in ( percentile( latencies, 0.5 ), percentile( latencies, 0.9 ), percentile( latencies, 0.99 ), latencies[-1] ) ) )
+    print( 'server       %s' % json.loads( body.decode( 'ascii' ) ) )
+
+
+def main():
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--port', type=int, default=None, help='port of a running server (default: start one)' )
+    parser.add_argument( '--workers', type=int, default=None, help='worker processes for the server this starts' )
+    parser.add_argument( '--clients', type=int, default=16, help='concurrent connections' )
+    parser.add_argument( '--requests', type=int, default=2000, help='total requests' )
+    parser.add_argument( '--zooms', type=int, nargs='+', default=[ 2, 3, 4 ], help='zoom levels to pick tiles from' )
+    parser.add_argument( '--max', type=int, default=200, help='maximum loop count' )
+    parser.add_argument( '--size', type=int, default=256, help='points along each side of a tile' )
+    parser.add_argument( '--kind', choices=( 'png', 'raw' ), default='png', help='tile format' )
+    args = parser.parse_args()
+    asyncio.run( run( args ) )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""Scaling benchmark for the parallel JuliaPlane refresh.
+
+Run from the top of the repository with
+    python -m benchmarks.bench_scaling --size 4000 --max 200
+
+The plane is refreshed once per thread count, from 1 up to every thread numba can use,
+and each result is checked against the single core plane to make sure the parallel
+kernel gives exactly the same counts.
+"""
+
+import argparse
+import time
+
+import numba as nb
+import numpy as np
+
+import cplane_np as jp
+
+
+def thread_counts(limit):
+    """Return 1, 2, 4, ... up to limit, always ending with limit itself."""
+    counts = []
+    n = 1
+    while n < limit:
+        counts.append( n )
+        n *= 2
+    counts.append( limit )
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--size', type=int, default=4000, help='points along each axis' )
+    parser.add_argument( '--max', type=int, default=100, help='maximum loop count' )
+    parser.add_argument( '--c', type=complex, default=complex( -0.8, 0.156 ), help='julia constant' )
+    parser.add_argument( '--threads', type=int, default=nb.config.NUMBA_NUM_THREADS, help='largest thread count to try' )
+    parser.add_argument( '--repeat', type=int, default=3, help='refreshes timed per thread count, best is reported' )
+    args = parser.parse_args()
+
+    plane = jp.JuliaPlane( -2., 2., args.size, -2., 2., args.size, args.c, args.max, workers=1 )
+    reference = np.array( plane.plane, copy=True )
+
+    print( '%8s %10s %8s %10s' % ( 'threads', 'seconds', 'speedup', 'identical' ) )
+    serial = None
+    for threads in thread_counts( args.threads ):
+        plane.workers = threads
+        plane.refresh()     # warm up, and compile the parallel kernel the first time through
+        best = None
+        for _ in range( args.repeat ):
+            start = time.perf_counter()
+            plane.refresh()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min( best, elapsed )
+        if serial is None:
+            serial = best
+        identical = np.array_equal( np.asarray( plane.plane ), reference )
+        print( '%8d %10.3f %8.2f %10s' % ( threads, best, serial/best, identical ) )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+
+"""Repeatable benchmark suite for cplane_np.
+
+Run from the top of the repository with
+    python -m benchmarks.run_benchmarks --output results.json
+and compare two runs (for example before and after a change) with
+    python -m benchmarks.run_benchmarks --output new.json --compare old.json
+
+The suite times importing cplane_np, JuliaPlane.refresh() over a range of grid sizes
+and maximum loop counts, the cost of compiling the kernels against loading them from numba's cache
+and against the steady state, the numpy engine used when numba is missing against the
+non-vectorized JuliaPlaneNV, the file I/O methods, and writing an image of a plane
+with to_image() against drawing and saving it with matplotlib.  Each case records its best
+time over a few repeats and the peak memory numpy and python allocated while it ran,
+as measured by tracemalloc.  The results are written as JSON.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numba as nb
+import numpy as np
+
+import cplane_np as jp
+
+
+#  the constant used throughout, one with a good mix of fast and slow points
+C = complex( -0.8, 0.156 )
+
+
+def measure(function, repeat):
+    """Call function repeat times, but at least once, and return the best time in seconds, and the peak traced
+    memory of one call."""
+    best = None
+    for _ in range( max( 1, repeat ) ):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min( best, elapsed )
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def bench_refresh(sizes, maxes, repeat):
+    """Time refresh() of a size x size plane for every combination of size and maximum loop count."""
+    results = []
+    for size in sizes:
+        for maxLoop in maxes:
+            plane = jp.JuliaPlane( -2., 2., size, -2., 2., size, C, maxLoop )
+            seconds, peak = measure( plane.refresh, repeat )
+            results.append( { "name":"refresh", "size":size, "max":maxLoop, "seconds":seconds, "peak_bytes":peak,
+                              "points_per_second":size*size/seconds } )
+    return results
+
+
+#  run in a fresh interpreter to time the first refresh, which includes compiling or loading the kernels
+_FIRST_CALL = '''
+import time
+start = time.perf_counter()
+import cplane_np as jp
+imported = time.perf_counter()
+jp.JuliaPlane( -2., 2., 64, -2., 2., 64, %r, 100 )
+print( imported - start, time.perf_counter() - imported )
+'''
+
+
+#  run in a fresh interpreter to time the import alone, and see which of the heavy libraries it pulled in
+_IMPORT = '''
+import sys
+import time
+start = time.perf_counter()
+import cplane_np
+print( time.perf_counter() - start, ' '.join( name for name in ( 'numba', 'pandas', 'matplotlib' ) if name in sys.modules ) )
+'''
+
+
+def bench_import(repeat):
+    """Time importing cplane_np in a new process, with numba's cache already filled, and record which of numba,
+    pandas and matplotlib the import loaded.  The import is timed at least once, whatever repeat is."""
+    times = []
+    for _ in range( max( 1, repeat ) + 1 ):
+        output = subprocess.run( [ sys.executable, '-c', _IMPORT ], check=True, stdout=subprocess.PIPE, universal_newlines=True ).stdout.split()
+        times.append( float( output[0] ) )
+    #  the first run may have had to fill numba's cache, so it is left out
+    return [ { "name":"import", "seconds":min( times[ 1: ] ), "loaded":output[ 1: ] } ]
+
+
+def bench_compile(repeat):
+    """Time the first refresh in a new process with an empty numba cache (a full compile), and again once the
+    cache is filled (loading the compiled kernels), against a refresh of the same plane in the steady state."""
+    results = []
+    with tempfile.TemporaryDirectory() as cachedir:
+        env = dict( os.environ, NUMBA_CACHE_DIR=cachedir )
+        for name in ( 'first_call_compile', 'first_call_cached' ):
+            output = subprocess.run( [ sys.executable, '-c', _FIRST_CALL % C ], env=env, check=True,
+                                     stdout=subprocess.PIPE, universal_newlines=True ).stdout
+            importSeconds, seconds = [ float( value ) for value in output.split() ]
+            results.append( { "name":name, "size":64, "max":100, "seconds":seconds, "import_seconds":importSeconds } )
+    plane = jp.JuliaPlane( -2., 2., 64, -2., 2., 64, C, 100 )
+    seconds, peak = measure( plane.refresh, repeat )
+    results.append( { "name":"steady_state", "size":64, "max":100, "seconds":seconds, "peak_bytes":peak } )
+    return results
+
+
+def bench_engines(size, repeat):
+    """Time a size x size plane computed by the numpy engine and by JuliaPlaneNV, the two that work without numba."""
+    results = []
+    for name, make in ( ( 'engine_numpy', lambda: jp.JuliaPlane( -2., 2., size, -2., 2., size, C, 100, engine='numpy' ) ),
+                        ( 'engine_nv', lambda: jp.JuliaPlaneNV( -2., 2., size, -2., 2., size, C, 100 ) ) ):
+        seconds, peak = measure( make, repeat )
+        results.append( { "name":name, "size":size, "max":100, "seconds":seconds, "peak_bytes":peak } )
+    return results
+
+
+def bench_io(size, repeat):
+    """Time each of the writers, and the readers on the files they wrote, for a size x size plane."""
+    results = []
+    plane = jp.JuliaPlane( -2., 2., size, -2., 2., size, C, 100 )
+    with tempfile.TemporaryDirectory() as folder:
+        for writer, reader, extension in ( ( 'toCSV', 'fromCSV', 'csv' ), ( 'toJSON', 'fromJSON', 'json' ), ( 'toBinary', 'fromBinary', 'jpl' ) ):
+            filename = os.path.join( folder, 'plane.' + extension )
+            seconds, peak = measure( lambda: getattr( plane, writer )( filename ), repeat )
+            results.append( { "name":writer, "size":size, "seconds":seconds, "peak_bytes":peak, "file_bytes":os.path.getsize( filename ) } )
+            target = jp.JuliaPlane()
+            seconds, peak = measure( lambda: getattr( target, reader )( filename ), repeat )
+            results.append( { "name":reader, "size":size, "seconds":seconds, "peak_bytes":peak } )
+    return results
+
+
+def bench_image(size, repeat):
+    """Time writing a PNG of a size x size plane with to_image(), and with a matplotlib figure as show() draws it."""
+    import matplotlib
+    matplotlib.use( 'Agg' )
+    import matplotlib.pyplot as plt
+
+    plane = jp.JuliaPlane( -2., 2., size, -2., 2., size, C, 100 )
+
+    def figure(filename):
+        fig = plt.figure( figsize=( size/100., size/100. ), dpi=100 )
+        plt.imshow( plane.plane, cmap='hot', interpolation='none', origin='lower', extent=[ plane.xmin, plane.xmax, plane.ymin, plane.ymax ] )
+        fig.savefig( filename )
+        plt.close( fig )
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join( folder, 'plane.png' )
+        for name, write in ( ( 'to_image', lambda: plane.to_image( filename, 'hot' ) ), ( 'matplotlib_png', lambda: figure( filename ) ) ):
+            seconds, peak = measure( write, repeat )
+            results.append( { "name":name, "size":size, "seconds":seconds, "peak_bytes":peak, "file_bytes":os.path.getsize( filename ) } )
+    return results
+
+
+def describe():
+    """Return the details of the machine and libraries the benchmarks ran on."""
+    return { "python":platform.python_version(), "numpy":np.__version__, "numba":nb.__version__,
+             "machine":platform.machine(), "cpus":os.cpu_count(), "time":time.strftime( '%Y-%m-%dT%H:%M:%S' ) }
+
+
+def compare(results, filename):
+    """Print how each result compares with the matching result in an earlier output file."""
+    with open( filename ) as jsonfile:
+        old = json.load( jsonfile )
+    keyed = { ( r[ 'name' ], r.get( 'size' ), r.get( 'max' ) ): r for r in old[ 'results' ] }
+    print( '%-20s %6s %6s %10s %10s %8s' % ( 'case', 'size', 'max', 'old', 'new', 'ratio' ) )
+    for result in results:
+        key = ( result[ 'name' ], result.get( 'size' ), result.get( 'max' ) )
+        if key in keyed:
+            before = keyed[ key ][ 'seconds' ]
+            print( '%-20s %6s %6s %10.4f %10.4f %8.2f' % ( key[0], key[1], key[2], before, result[ 'seconds' ], result[ 'seconds' ]/before ) )
+
+
+def main():
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--sizes', type=int, nargs='+', default=[ 250, 500, 1000, 2000 ], help='grid sizes for the refresh cases' )
+    parser.add_argument( '--maxes', type=int, nargs='+', default=[ 100, 1000 ], help='maximum loop counts for the refresh cases' )
+    parser.add_argument( '--io-size', type=int, default=1000, help='grid size for the I/O cases' )
+    parser.add_argument( '--engine-size', type=int, default=500, help='grid size for the numpy engine and JuliaPlaneNV cases' )
+    parser.add_argument( '--image-size', type=int, default=2000, help='grid size for the image cases' )
+    parser.add_argument( '--repeat', type=int, default=3, help='runs per case, at least 1, the best is reported' )
+    parser.add_argument( '--output', help='file to write the JSON results to (default: standard output)' )
+    parser.add_argument( '--compare', help='earlier JSON results to compare against' )
+    args = parser.parse_args()
+
+    results = []
+    results += bench_import( args.repeat )
+    results += bench_compile( args.repeat )
+    results += bench_refresh( args.sizes, args.maxes, args.repeat )
+    results += bench_engines( args.engine_size, args.repeat )
+    results += bench_io( args.io_size, args.repeat )
+    results += bench_image( args.image_size, args.repeat )
+    report = { "machine":describe(), "results":results }
+
+    if args.output:
+        with open( args.output, 'w' ) as jsonfile:
+            json.dump( report, jsonfile, indent=2 )
+    else:
+        json.dump( report, sys.stdout, indent=2 )
+        print()
+    if args.compare:
+        compare( results, args.compare )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,87 @@
 #!/usr/bin/env python3
 
 import numpy as np
-import pandas as pd
-import csv                # for I/O with csv format files
-import json               # for I/O with json formatted data
+import os
+import math
+import hashlib            # for the file names of the on-disk tile cache
+from collections import OrderedDict
+import struct             # for the header of the binary format
+import concurrent.futures # for evaluating f on several chunks of the plane at once
+import contextlib
+import itertools
+import multiprocessing    # for the process pool of JuliaPlane.renderShared()
+import weakref
+from multiprocessing import shared_memory
+import time               # for the phase timers of RenderStats
+import zlib               # for the optional compression of the binary format
 import abscplane as absc
-import matplotlib.pyplot as plt
-import numba as nb        # Just-In-Time compilation
+#  pandas, matplotlib, csv and json are imported where they are used, so that code which only computes planes
+#  does not pay for loading them
+try:
+    import numba as nb    # Just-In-Time compilation
+    _NUMBA = True
+except ImportError:
+    _NUMBA = False
+
+
+class _PlainPython(object):
+    """This stands in for numba when it cannot be imported.  Its decorators hand the kernels back unchanged, so
+    they still work, as ordinary (and slow) python, and prange is just range.  The 'direct' counts that most
+    planes need are computed by the numpy engine instead (see JuliaPlane's engine option)."""
+    prange = range
+
+    def njit(self, *args, **options):
+        return lambda function: function
+
+    vectorize = njit
+
+    def __getattr__(self, name):
+        #  the numba types used in the kernel signatures, such as nb.int32(nb.complex128, ...)
+        return lambda *args: None
+
+
+if not _NUMBA:
+    nb = _PlainPython()
+
+
+def _tile_slices(length, origin, tile):
+    """Split the indices 0..length-1 of an axis into slices that end on the multiples of tile, counting the
+    first index as number origin on the global grid."""
+    slices = []
+    start = 0
+    while start < length:
+        stop = min( length, start + tile - ( origin + start ) % tile )
+        slices.append( slice( start, stop ) )
+        start = stop
+    return slices
+
+
+def _same_step(a, b):
+    """True if the grid steps a and b are equal, allowing for rounding in how they were calculated."""
+    return abs( a - b ) <= 1e-9*abs( b )
+
+
+def _whole(n):
+    """True if n is a whole number, allowing for rounding in how it was calculated."""
+    return abs( n - round( n ) ) <= 1e-6
+
+
+def _grid_step(step):
+    """Return the grid step step rounded to 12 significant figures, so that the same step calculated from
+    different windows gives the same number (see _same_step())."""
+    return float( '%.12g' % step )
+
+
+def _grid_point(x, step):
+    """Return the place of the coordinate x on the grid of the given step as ( index, offset ), where x is
+    ( index + offset )*step, index is a whole number and offset is the part of a step left over.  The offset is
+    rounded (see _whole()), so coordinates calculated in different ways for the same grid point give the same
+    pair."""
+    position = x/step
+    index = int( round( position ) )
+    #  adding 0.0 turns -0.0 into 0.0, which matters for the repr() of keys made from it
+    return index, round( position - index, 6 ) + 0.0
+
 
 class ComplexPlaneNP(absc.AbsComplexPlane):
     """This is the Class ComplexPlaneNP.  It is built from the Abstract Class AbsComplexPlane.
@@ -15,14 +90,15 @@ class ComplexPlaneNP(absc.AbsComplexPlane):
     point is:
         value = f( x + yj )
 
-    This class uses the data structures available in numpy and pandas.  The array data structure
-    is used from numpy to set up the rows for the plane.  The rows are then inserted into a pandas
-    DataFrame and given row and column names to help identify the rows and columns in the plane.
+    This class uses the data structures available in numpy and pandas.  The plane itself is kept as
+    a plain numpy array in self.plane.  A pandas DataFrame with row and column names to help identify
+    the rows and columns in the plane is only built when it is asked for, through self.frame.
 
-    The contents of each 'cell' in the ComplexPlaneNP is of type imaginary number.
+    The contents of each 'cell' in the ComplexPlaneNP is whatever f returns for that point, which with the
+    default identity function is the imaginary number of the point itself.
     """
 
-    def __init__(self, newXmin=-5., newXmax=5., newXlen=1001, newYmin=-5., newYmax=5., newYlen=1001, f=lambda x: x, maxLoop=100):
+    def __init__(self, newXmin=-5., newXmax=5., newXlen=1001, newYmin=-5., newYmax=5., newYlen=1001, f=lambda x: x, maxLoop=100, deferred=False, chunkRows=None, workers=1):
         """This is the creator.  It can be passed the the min/max X and Y values for the plane,
         and a transformation function (f).  There are default values if the parameters are not
         passed to the creator.
@@ -31,6 +107,14 @@ class ComplexPlaneNP(absc.AbsComplexPlane):
         f() for computing the values in the plane is the identity function, so the values at
         the coordinate location are the coordinates themselves.  Note also that the number of
         points in each axis is always forced to be fixed value.
+        If deferred is True the plane is not generated yet:  self.plane is None until refresh() is called.
+
+        f is called on the plane a block of whole rows at a time, and must work element by element, returning an
+        array of the same shape as the block of points it is given.  chunkRows sets the number of rows in a
+        block; by default each block holds about a million points, so the temporary arrays made by f stay the
+        same size however large the plane is.  workers sets how many threads the blocks are shared out across:
+        1 (the default) evaluates them one after another, None uses one thread per core, and any other number
+        uses that many threads.  Threads only help when f spends its time in numpy calls that release the GIL.
         """
         self.xmin = newXmin
         self.xmax = newXmax
@@ -43,8 +127,12 @@ class ComplexPlaneNP(absc.AbsComplexPlane):
         self.ystep = (self.ymax - self.ymin)/(self.ylen - 1)
         self.f = f
         self.max = maxLoop
+        self.chunkRows = chunkRows
+        self.workers = workers
         #  call refresh() to generate the the plane and its contents
-        self.refresh()
+        self.plane = None
+        if not deferred:
+            self.refresh()
 
 
 
@@ -55,12 +143,66 @@ class ComplexPlaneNP(absc.AbsComplexPlane):
         """
         rx = np.linspace( self.xmin, self.xmax, self.xlen )
         ry = np.linspace( self.ymin, self.ymax, self.ylen )
-        x, y = np.meshgrid( rx, ry )
-        planeArray = x + y*1j
-        self.f( planeArray )
-        ylabels = [str(self.ymax-ypos*self.ystep) for ypos in range(self.ylen)]
+        self.plane = self._render( rx, ry )
+
+
+    def _render(self, rx, ry):
+        """Compute and return the block of the plane for the x coordinates rx and the y coordinates ry, with
+        row i of the block holding the points at y = ry[i].  refresh() calls this for the whole plane, and pan()
+        calls it for just the strips that come into view.  Subclasses override it to change what is computed.
+        f is evaluated on blocks of self.chunkRows rows, on self.workers threads (see the creator).
+        """
+        rows = self.chunkRows or max( 1, _CHUNK_POINTS//max( 1, len( rx ) ) )
+        blocks = [ slice( start, start + rows ) for start in range( 0, len( ry ), rows ) ]
+
+        def evaluate(block):
+            #  broadcast the two axes against each other, rather than building x and y grids with np.meshgrid first
+            return np.asarray( self.f( rx[np.newaxis, :] + ry[block, np.newaxis]*1j ) )
+
+        #  the first block tells us the type of f's values, and so the type of the plane
+        first = evaluate( blocks[0] )
+        planeArray = np.empty( ( len( ry ), len( rx ) ) + first.shape[2:], dtype=first.dtype )
+        planeArray[ blocks[0] ] = first
+
+        def fill(block):
+            planeArray[ block ] = evaluate( block )
+
+        if self.workers == 1 or len( blocks ) == 1:
+            for block in blocks[1:]:
+                fill( block )
+        else:
+            with concurrent.futures.ThreadPoolExecutor( self.workers or os.cpu_count() ) as pool:
+                #  list() waits for every block, and raises the first exception f raised, if any
+                list( pool.map( fill, blocks[1:] ) )
+        return planeArray
+
+
+    @property
+    def frame(self):
+        """The plane as a pandas DataFrame, with the y coordinates as the row names and the x coordinates as the
+        column names.  The DataFrame is only built the first time it is asked for after a refresh, and pandas is
+        not imported until then, so code that only needs the numbers in self.plane never pays for either.
+        """
+        if getattr( self, '_frame', None ) is None or self._frameSource is not self.plane:
+            stats = getattr( self, 'stats', None )
+            with _timed( stats, 'labels' ):
+                ylabels, xlabels = self._labels()
+            with _timed( stats, 'frame' ):
+                import pandas as pd
+                self._frame = pd.DataFrame(self.plane, index=ylabels, columns=xlabels)
+            self._frameSource = self.plane
+        return self._frame
+
+
+    def _labels(self):
+        """Return the row (y) and column (x) names used for the plane's DataFrame and the JSON output."""
+        ylabels = [str(self._rowY(ypos)) for ypos in range(self.ylen)]
         xlabels = [str(xpos*self.xstep+self.xmin) for xpos in range(self.xlen)]
-        self.plane = pd.DataFrame(planeArray, index=ylabels, columns=xlabels)
+        return ylabels, xlabels
+
+    def _rowY(self, ypos):
+        """Return the y coordinate of row ypos of the plane.  Row 0 is ymin, as the plane is laid out by refresh()."""
+        return ypos*self.ystep+self.ymin
 
 
 
@@ -70,13 +212,73 @@ class ComplexPlaneNP(absc.AbsComplexPlane):
         Zoom into the indicated range of the x- and y-axes.
         Refresh the plane as needed."""
         # note that xstep and ystep must be recalculated for the new min and max
+        xstep = (newXmax - newXmin)/(self.xlen - 1)
+        ystep = (newYmax - newYmin)/(self.ylen - 1)
+
+        #  if the new grid lines up with the old one, only the part that comes into view has to be computed
+        dx = (newXmin - self.xmin)/self.xstep
+        dy = (newYmin - self.ymin)/self.ystep
+        if _same_step( xstep, self.xstep ) and _same_step( ystep, self.ystep ) and _whole( dx ) and _whole( dy ):
+            self._shift( int( round( dx ) ), int( round( dy ) ), newXmin, newXmax, newYmin, newYmax )
+            return
+
+        self.xmin = newXmin
+        self.xmax = newXmax
+        self.ymin = newYmin
+        self.ymax = newYmax
+        self.xstep = xstep
+        self.ystep = ystep
+        self.refresh()
+
+
+
+    def pan(self, dx, dy):
+        """Move the plane dx grid steps along the x axis and dy grid steps along the y axis, keeping the same
+        step sizes.  Positive values move the window towards larger x and y.  The points still in view are
+        shifted across from the current plane, and only the strips that come into view are computed, so a small
+        pan costs work in proportion to the new area rather than the whole plane.  dx and dy must be whole
+        numbers, as only whole steps keep the grid lined up with the points already computed; anything else
+        raises a ValueError."""
+        if not ( _whole( dx ) and _whole( dy ) ):
+            raise ValueError( 'pan() moves the plane by whole grid steps, not %r, %r' % ( dx, dy ) )
+        dx = int( round( dx ) )
+        dy = int( round( dy ) )
+        self._shift( dx, dy, self.xmin + dx*self.xstep, self.xmax + dx*self.xstep, self.ymin + dy*self.ystep, self.ymax + dy*self.ystep )
+
+
+
+    def _shift(self, dx, dy, newXmin, newXmax, newYmin, newYmax):
+        """Move to the window newXmin..newXmax, newYmin..newYmax, which must be the current window moved by dx and
+        dy grid steps.  The overlap is copied from the current plane and the rest is computed by _render()."""
         self.xmin = newXmin
         self.xmax = newXmax
         self.ymin = newYmin
         self.ymax = newYmax
         self.xstep = (self.xmax - self.xmin)/(self.xlen - 1)
         self.ystep = (self.ymax - self.ymin)/(self.ylen - 1)
-        self.refresh()
+        if self.plane is None or abs( dx ) >= self.xlen or abs( dy ) >= self.ylen:
+            #  nothing overlaps, or a deferred plane has not been computed yet, so there is nothing to reuse
+            self.refresh()
+            return
+
+        rx = np.linspace( self.xmin, self.xmax, self.xlen )
+        ry = np.linspace( self.ymin, self.ymax, self.ylen )
+        old = self.plane
+        plane = np.empty( old.shape, dtype=old.dtype )
+
+        #  row i of the new plane is row i+dy of the old one, and likewise for the columns
+        keepRows = slice( max( 0, -dy ), self.ylen - max( 0, dy ) )
+        keepCols = slice( max( 0, -dx ), self.xlen - max( 0, dx ) )
+        plane[ keepRows, keepCols ] = old[ max( 0, dy ):self.ylen + min( 0, dy ), max( 0, dx ):self.xlen + min( 0, dx ) ]
+
+        #  compute the rows that came into view at full width, then the columns that came into view beside the kept rows
+        for rows in ( slice( 0, max( 0, -dy ) ), slice( self.ylen - max( 0, dy ), self.ylen ) ):
+            if rows.stop > rows.start:
+                plane[ rows, : ] = self._render( rx, ry[ rows ] )
+        for cols in ( slice( 0, max( 0, -dx ) ), slice( self.xlen - max( 0, dx ), self.xlen ) ):
+            if cols.stop > cols.start:
+                plane[ keepRows, cols ] = self._render( rx[ cols ], ry[ keepRows ] )
+        self.plane = plane
 
 
 
@@ -98,27 +300,433 @@ class JuliaPlane(ComplexPlaneNP):
     The contents of each 'cell' in the JuliaPlane is of type integer.
     """
 
-    def __init__(self, newXmin=-5., newXmax=5., newXlen=11, newYmin=-5., newYmax=5., newYlen=11, c=(-1.037 + 0.17j), maxLoop=100):
+    def __init__(self, newXmin=-5., newXmax=5., newXlen=11, newYmin=-5., newYmax=5., newYlen=11, c=(-1.037 + 0.17j), maxLoop=100, workers=1, cache=None, cycles=False, method='direct', precision=None, deferred=False, output='counts', modulus=False, adaptive=None, engine=None, stats=None, schedule='static'):
         """ The JuliaPlane creator method uses the ComplexPlaneNP creator to generate the initial 2D plane.
         The function for this plane is then reset to a new function, and the values re-generated.
         Note that since this function was intially created, the f parameter was added to ComplexPlaneNP's
         creator, but this code was not updated to take advantage of the passed parameter change.
+
+        workers sets how many cores refresh() uses.  The default of 1 computes the plane on a single core,
+        None uses every core numba can see, and any other number uses up to that many threads.  The plane
+        is the same whichever setting is used.
+
+        cache is an optional TileCache.  When one is given, refresh() builds the plane out of tiles, taking
+        the ones it has already seen from the cache instead of computing them again, and so do pan() and
+        zoom().  One cache can be shared by many planes.
+
+        cycles turns on periodicity checking, which stops iterating a point as soon as its orbit is seen to
+        repeat.  The counts are exactly the same, but planes that are mostly inside the julia set, with a large
+        maxLoop, are computed much faster.  It costs a little extra on planes that are mostly outside the set.
+
+        method chooses how the plane is filled in.  'direct' (the default) computes every point.  'subdivide'
+        uses the Mariani-Silver method:  the plane is split into rectangles, and when every point on the border
+        of a rectangle has the same count, the inside is filled with that count without being computed;
+        otherwise the rectangle is split into four and each quarter is tried in turn.  Large areas of a single
+        count, far outside the set or deep inside it, then cost little more than their outline.  A border of
+        count 1 is only trusted on a rectangle that lies wholly outside the disk |z| <= 2, where every point
+        starts out too big; anywhere else a border of 1s can surround the whole set, so the rectangle is split
+        instead.  A thin piece of the set that lies entirely inside a border of any other count is still missed,
+        so 'subdivide' is a close approximation; use 'direct' whenever the plane must match the point by point
+        counts exactly.
+
+        precision chooses the arithmetic.  None (the default) iterates z as a complex128 number and compares
+        abs(z), which takes a square root, with 2.  'float64' keeps the real and imaginary parts of z as separate
+        doubles, compares |z|**2 with 4, and works on several points at once in a form that LLVM can vectorize;
+        it gives exactly the same counts.  'float32' does the same in single precision, which is faster again
+        but only good enough for previews, as the counts drift near the edge of the set.  Periodicity checking
+        (cycles) is only available with precision=None.
+
+        deferred skips computing the plane in the creator, leaving self.plane as None, so that it can be built
+        later by refresh() or, to see something straight away, by progressive().
+
+        output chooses what the plane holds.  'counts' (the default) gives the integer escape-time counts.
+        'smooth' gives the normalized iteration count instead, a float32 value that runs continuously from one
+        count to the next, count + 1 - log2(log2(|z|)) where z is the first value past 2, so that images of the
+        plane are free of bands; points that reach maxLoop are 0, as their counts are.  'both' keeps the counts
+        in self.plane and the smooth values in self.smooth, both filled in by the same loop over the points.
+        With modulus=True the final |z| of every point is also kept, as float32, in self.modulus.  Only what is
+        asked for is computed and kept:  self.smooth is None with output='counts', and self.modulus is None
+        without modulus=True.  The smooth
+        values and the modulus are only available with the 'direct' method, precision=None, and without
+        cycles or a cache.
+
+        adaptive, if given, is the loop count of the first of a series of rounds.  Every point is iterated up to
+        that count, the points that have escaped are finished, and the rest are packed together and carried on,
+        from where they stopped, to twice the count, and so on until maxLoop is reached.  The counts are exactly
+        those of a single pass with maxLoop, but each round works on a dense array of just the points that are
+        still unresolved.  The points are carried through the rounds a band of rows at a time, so the packed
+        points take up no more than one band's worth of memory.  Packing the points costs time:  on one core
+        a plane takes about 1.5 times as long as the 'direct' method, so adaptive is mainly of use for what
+        self.rounds shows; to keep the threads evenly loaded use schedule='dynamic'.  After each refresh() or
+        progressive() self.rounds holds a (loop count, points iterated, points left) tuple for each round, added
+        up over the whole plane, to help choose a good starting count; pan() and zoom() recompute the whole
+        plane, so that self.rounds still describes it.  adaptive needs the 'direct' method and precision=None,
+        and cannot be used with cycles or the smooth output.
+
+        engine chooses what computes the 'direct' counts.  'numba' uses the compiled kernels.  'numpy' works on
+        whole blocks of the plane with numpy, advancing every point that has not escaped yet by one loop at a
+        time and dropping the points that escape from the arrays as it goes; it gives exactly the same counts,
+        in either precision, and needs nothing but numpy.  The default, None, picks 'numba' when numba can be
+        imported and 'numpy' when it cannot.  The other methods and outputs always use the kernels, which
+        without numba run as plain python.
+
+        stats turns on instrumentation.  Pass True for a new RenderStats, or a RenderStats of your own, perhaps
+        shared with other planes or given hooks that feed another metrics system; it is kept in self.stats.
+        refresh() then times each of its phases and tallies the points and loops of every plane it computes
+        (see RenderStats).  With the default of None, self.stats is None and nothing is measured.
+
+        schedule decides how the rows are shared out when workers is not 1.  With 'static' (the default) each
+        thread gets an equal, fixed block of rows, so the thread whose block crosses the set can still be busy
+        long after the others have finished.  'dynamic' hands the rows out one at a time to whichever thread is
+        free.  'balanced' does the same, but first computes a coarse sample of the plane, every 8th point
+        along each axis, to estimate what each row will cost, and hands out the most
+        expensive rows first, so the cheap ones fill in at the end.  The sample is computed across the same
+        threads, and adds about 1/64 to the work.  The counts are the same whichever is used.
+        Only the 'direct' method in precision=None with the numba engine can be scheduled.
         """
+        if method not in ( 'direct', 'subdivide' ):
+            raise ValueError( "method must be 'direct' or 'subdivide', not %r" % ( method, ) )
+        if precision not in _PRECISIONS:
+            raise ValueError( "precision must be None, 'float64' or 'float32', not %r" % ( precision, ) )
+        if cycles and precision is not None:
+            raise ValueError( 'cycles can only be used with precision=None' )
+        if schedule not in _SCHEDULES:
+            raise ValueError( "schedule must be 'static', 'dynamic' or 'balanced', not %r" % ( schedule, ) )
+        if output not in ( 'counts', 'smooth', 'both' ):
+            raise ValueError( "output must be 'counts', 'smooth' or 'both', not %r" % ( output, ) )
+        if ( output != 'counts' or modulus ) and ( method != 'direct' or precision is not None or cycles or cache is not None ):
+            raise ValueError( "smooth output and modulus need method='direct', precision=None, no cycles and no cache" )
+        if adaptive is not None and ( method != 'direct' or precision is not None or cycles or output != 'counts' or modulus ):
+            raise ValueError( "adaptive needs method='direct', precision=None, no cycles and counts output" )
+        if adaptive is not None and adaptive < 1:
+            raise ValueError( 'adaptive must be at least 1, not %r' % ( adaptive, ) )
+        if engine is None:
+            engine = 'numba' if _NUMBA else 'numpy'
+        if engine not in ( 'numba', 'numpy' ):
+            raise ValueError( "engine must be None, 'numba' or 'numpy', not %r" % ( engine, ) )
+        if engine == 'numba' and not _NUMBA:
+            raise ValueError( "engine='numba' needs numba, which could not be imported" )
+        if schedule != 'static' and ( method != 'direct' or precision is not None or engine != 'numba' or adaptive is not None ):
+            raise ValueError( "schedule needs method='direct', precision=None, the numba engine and no adaptive" )
         #  set the function and re-compute the plane's values
         f = julia(c, maxLoop)
         self.c = c
-        ComplexPlaneNP.__init__(self, newXmin, newXmax, newXlen, newYmin, newYmax, newYlen, f, maxLoop)
+        self.workers = workers
+        self.cache = cache
+        self.cycles = cycles
+        self.method = method
+        self.precision = precision
+        self.output = output
+        self.withModulus = modulus
+        self.adaptive = adaptive
+        self.rounds = []
+        self.engine = engine
+        self.stats = RenderStats() if stats is True else stats
+        self.schedule = schedule
+        self.smooth = None
+        self.modulus = None
+        ComplexPlaneNP.__init__(self, newXmin, newXmax, newXlen, newYmin, newYmax, newYlen, f, maxLoop, deferred, workers=workers)
+
+    def refresh(self):
+        """Regenerate the julia plane.
+        Every point (x + y*1j) in the plane is replaced by its escape-time count for the constant self.c,
+        using the compiled kernel directly.  When self.workers is not 1 the rows are computed in parallel.
+        """
+        self.rounds = []
+        if self.stats is not None:
+            self._refreshMeasured()
+            return
+        rx = np.linspace( self.xmin, self.xmax, self.xlen )
+        ry = np.linspace( self.ymin, self.ymax, self.ylen )
+        self.plane = self._renderAll( rx, ry )
+
+    def _renderAll(self, rx, ry):
+        """Compute the whole plane for the axes rx and ry, in whichever way the plane's options call for."""
+        if self._extraOutputs():
+            return self._renderSmooth( rx, ry )
+        if self.cache is None:
+            return self._render( rx, ry )
+        return self._renderCached( rx, ry )
+
+    def _refreshMeasured(self):
+        """refresh(), with each phase timed and the new plane tallied in self.stats.  A computation that had to
+        compile kernels, or load them from numba's cache, is timed as 'compile' rather than 'kernel'."""
+        stats = self.stats
+        with stats.phase( 'grid' ):
+            rx = np.linspace( self.xmin, self.xmax, self.xlen )
+            ry = np.linspace( self.ymin, self.ymax, self.ylen )
+        compiled = _compiled_count()
+        start = time.perf_counter()
+        self.plane = self._renderAll( rx, ry )
+        stats.record( 'compile' if _compiled_count() > compiled else 'kernel', time.perf_counter() - start )
+        #  smooth values are not counts, so there is nothing to tally for output='smooth'
+        if self.output != 'smooth':
+            with stats.phase( 'tally' ):
+                stats.tally( self.plane, rx, ry, self.c, self.max )
+        stats.refreshes += 1
+
+    def _extraOutputs(self):
+        """Return True when the plane is more than the counts alone:  smooth values or the modulus as well."""
+        return self.output != 'counts' or self.withModulus
+
+    def _renderSmooth(self, rx, ry):
+        """Compute whichever of the counts, the smooth values and the modulus are wanted for the axes rx and ry,
+        in a single pass over the points.  The smooth values and the modulus are stored in self.smooth and
+        self.modulus, or None when they are not wanted, and the array for self.plane is returned."""
+        shape = ( len( ry ), len( rx ) )
+        #  the kernel skips the arrays that are not wanted, so they can be a single element
+        keepCounts = self.output != 'smooth'
+        keepSmooth = self.output != 'counts'
+        counts = np.empty( shape if keepCounts else ( 1, 1 ), dtype=np.int32 )
+        smooth = np.empty( shape if keepSmooth else ( 1, 1 ), dtype=np.float32 )
+        modulus = np.empty( shape if self.withModulus else ( 1, 1 ), dtype=np.float32 )
+        _run_kernel( _smooth_rows, _smooth_rows_parallel, self.workers, rx, ry, complex( self.c ), self.max, counts, smooth, modulus, keepCounts, keepSmooth, self.withModulus )
+        self.smooth = smooth if keepSmooth else None
+        self.modulus = modulus if self.withModulus else None
+        return counts if keepCounts else smooth
+
+    def _shift(self, dx, dy, newXmin, newXmax, newYmin, newYmax):
+        """Move to the new window.  When the plane has smooth values or the modulus alongside it, or adaptive
+        rounds in self.rounds, the whole plane is recomputed rather than shifted, so that they all stay in step.
+        With a cache, the whole plane is built from its tiles, so the tiles still in view are found there and
+        the new ones are stored."""
+        if not self._extraOutputs() and self.adaptive is None and self.cache is None:
+            ComplexPlaneNP._shift( self, dx, dy, newXmin, newXmax, newYmin, newYmax )
+            return
+        self.xmin = newXmin
+        self.xmax = newXmax
+        self.ymin = newYmin
+        self.ymax = newYmax
+        self.xstep = (self.xmax - self.xmin)/(self.xlen - 1)
+        self.ystep = (self.ymax - self.ymin)/(self.ylen - 1)
+        self.refresh()
+
+    def _renderCached(self, rx, ry):
+        """Build the plane for the axes rx and ry out of the tiles in self.cache, computing and storing the ones
+        it does not have.  The tile edges are placed on multiples of the cache's tile size counted from the
+        origin in grid steps, rather than from the corner of the plane, so a plane that has been panned or
+        zoomed to a window that lines up with an earlier one can still share its tiles.  Each tile is keyed on
+        its place on the grid rather than on its coordinates, which can differ in the last bit from one window
+        to the next."""
+        tile = self.cache.tileSize
+        plane = np.empty( ( len( ry ), len( rx ) ), dtype=np.int32 )
+        xorigin, xoffset = _grid_point( rx[0], self.xstep )
+        yorigin, yoffset = _grid_point( ry[0], self.ystep )
+        for rows in _tile_slices( len( ry ), yorigin, tile ):
+            for cols in _tile_slices( len( rx ), xorigin, tile ):
+                key = self._tileKey( ( _grid_step( self.xstep ), xoffset, xorigin + cols.start, cols.stop - cols.start ),
+                                     ( _grid_step( self.ystep ), yoffset, yorigin + rows.start, rows.stop - rows.start ) )
+                block = self.cache.get( key )
+                if block is None:
+                    block = self._render( rx[ cols ], ry[ rows ] )
+                    self.cache.put( key, block )
+                plane[ rows, cols ] = block
+        return plane
+
+    def _tileKey(self, xaxis, yaxis):
+        """Return the cache key of a tile:  everything that decides its counts.  Each axis is given as ( step,
+        offset, first, length ), the tile starting at grid point first, which is at ( first + offset )*step."""
+        c = complex( self.c )
+        return ( 'julia', self.method, self.precision, c.real, c.imag, int( self.max ) ) + tuple( xaxis ) + tuple( yaxis )
+
+    def _render(self, rx, ry):
+        """Compute and return the escape-time counts for the x coordinates rx and the y coordinates ry."""
+        #  only the two axes are passed in, the kernel forms each point itself and writes straight into counts
+        if self.adaptive is not None:
+            return self._renderAdaptive( rx, ry )
+        if self.method == 'subdivide':
+            #  every point starts out marked as not computed yet
+            counts = np.full( ( len( ry ), len( rx ) ), -1, dtype=np.int32 )
+            _run_kernel( _subdivide_rows, _subdivide_rows_parallel, self.workers, _escape( self.cycles, self.precision ), rx, ry, complex( self.c ), self.max, counts, _SUBDIVIDE_BLOCK )
+            return counts
+        counts = np.empty( ( len( ry ), len( rx ) ), dtype=np.int32 )
+        if self.schedule == 'static' or self.workers == 1:
+            _direct_fill( rx, ry, self.c, self.max, counts, self.workers, self.cycles, self.precision, self.engine )
+        else:
+            _scheduled_fill( rx, ry, self.c, self.max, counts, self.workers, self.cycles, self.schedule )
+        return counts
 
-    def show(self, chosenmap=plt.cm.hot):
+    def renderShared(self, processes=None, bandRows=None):
+        """Regenerate the julia plane across a pool of worker processes, and return it.  The plane is made in a
+        block of multiprocessing.shared_memory, and each worker writes the rows it computes straight into that
+        block, so no counts are ever pickled or copied back.  The rows are handed out in bands of bandRows
+        rows, one band at a time to whichever worker is free, so a worker that gets cheap bands far from the
+        set simply takes more of them while another works through the expensive ones near its edge.  By
+        default there are about 16 bands for each of the processes workers (one per core if None).
+
+        When the workers are done self.plane becomes a numpy array over the shared block itself, with no copy;
+        the block is released once nothing refers to it any more.  Each worker computes its bands on a single
+        core, with the plane's engine, precision and cycles options.  Only the 'direct' method with the counts
+        output is supported, and the cache is not used.  The workers are new python processes, which import
+        cplane_np (and so the main script too, which must keep its work under if __name__ == '__main__').
+        """
+        if self.method != 'direct' or self.adaptive is not None or self._extraOutputs():
+            raise ValueError( "renderShared() only computes the 'direct' counts" )
+        processes = processes or os.cpu_count()
+        bandRows = bandRows or max( 1, -( -self.ylen // ( 16*processes ) ) )
+        shape = ( self.ylen, self.xlen )
+        block = shared_memory.SharedMemory( create=True, size=max( 1, self.ylen*self.xlen*4 ) )
+        try:
+            options = ( self.xmin, self.xmax, self.xlen, self.ymin, self.ymax, self.ylen, complex( self.c ), self.max, self.cycles, self.precision, self.engine )
+            #  the workers are started fresh rather than forked, as a fork can hang on locks held by numba's threads
+            with multiprocessing.get_context( 'spawn' ).Pool( processes, _attach_shared, ( block.name, shape, options ) ) as pool:
+                bands = [ ( start, min( start + bandRows, self.ylen ) ) for start in range( 0, self.ylen, bandRows ) ]
+                #  a chunk size of 1 hands each band to the next worker that is free
+                pool.map( _render_band, bands, 1 )
+        except BaseException:
+            #  there is no plane over the block, so nothing else will release the mapping
+            block.close()
+            raise
+        finally:
+            #  the name goes at once, but the memory stays mapped here for as long as the plane needs it
+            block.unlink()
+        plane = np.ndarray( shape, dtype=np.int32, buffer=block.buf )
+        weakref.finalize( plane, _close_shared, block )
+        self.plane = plane
+        return plane
+
+    def _renderAdaptive(self, rx, ry):
+        """Compute the escape-time counts for the axes rx and ry in rounds of rising loop counts, carrying only the
+        unresolved points from one round to the next.  The plane is worked through a band of about a million
+        points at a time, so the packed points never take up more than that band would, and the rounds of every
+        band are added into self.rounds."""
+        counts = np.empty( ( len( ry ), len( rx ) ), dtype=np.int32 )
+        rows = max( 1, _CHUNK_POINTS//max( 1, len( rx ) ) )
+        for start in range( 0, len( ry ), rows ):
+            self._adaptiveBand( rx, ry[ start:start + rows ], counts[ start:start + rows ] )
+        return counts
+
+    def _adaptiveBand(self, rx, ry, out):
+        """Fill out with the escape-time counts for the axes rx and ry in adaptive rounds (see _renderAdaptive()),
+        adding each round's figures to self.rounds."""
+        points = ( rx[np.newaxis, :] + ry[:, np.newaxis]*1j ).ravel()
+        #  points still iterating when max is reached keep the count of 0
+        counts = out.reshape( -1 )
+        counts[:] = 0
+        index = np.arange( len( points ), dtype=np.int32 )
+        done = 0
+        limit = min( self.adaptive, self.max )
+        for k in itertools.count():
+            alive = np.empty( len( index ), dtype=np.bool_ )
+            _run_kernel( _adaptive_round, _adaptive_round_parallel, self.workers, points, complex( self.c ), done, limit, index, counts, alive )
+            #  pack the unresolved points together for the next round
+            points = points[ alive ]
+            index = index[ alive ]
+            if k < len( self.rounds ):
+                iterated, left = self.rounds[ k ][1:]
+                self.rounds[ k ] = ( limit, iterated + len( alive ), left + len( index ) )
+            else:
+                self.rounds.append( ( limit, len( alive ), len( index ) ) )
+            if limit >= self.max or not len( index ):
+                break
+            done = limit
+            limit = min( 2*limit, self.max )
+
+    def progressive(self, levels=5, callback=None):
+        """Regenerate the julia plane coarse to fine, as a generator.  The first level computes every
+        2**(levels-1)-th point along each axis.  Each level after that halves the step, computing only the
+        points that are new on the finer grid, as the points of the coarser grids are already part of it.  After
+        each level the generator yields (step, preview), where preview is plane[::step, ::step], the points
+        computed so far, and calls callback(step, preview) if a callback is given.  The last level has a step of
+        1, and once it is done self.plane holds the full plane, exactly as refresh() would give it, for the same
+        amount of computation.  For example:
+            for step, preview in plane.progressive():
+                display( preview )
+        Only the counts are built this way, so progressive() cannot be used with smooth output or the modulus.
+        """
+        if self._extraOutputs():
+            raise ValueError( 'progressive() only builds planes of counts' )
+        if levels < 1:
+            raise ValueError( 'progressive() needs at least one level, not %r' % ( levels, ) )
+        rx = np.linspace( self.xmin, self.xmax, self.xlen )
+        ry = np.linspace( self.ymin, self.ymax, self.ylen )
+        plane = np.empty( ( self.ylen, self.xlen ), dtype=np.int32 )
+        self.rounds = []
+        step = 2**( levels - 1 )
+        plane[ ::step, ::step ] = self._render( rx[ ::step ].copy(), ry[ ::step ].copy() )
+        while True:
+            preview = plane[ ::step, ::step ]
+            if callback is not None:
+                callback( step, preview )
+            if step == 1:
+                self.plane = plane
+            yield step, preview
+            if step == 1:
+                return
+            #  the new points lie on the rows between the old ones, and on the old rows between the old columns
+            half = step // 2
+            plane[ half::step, ::half ] = self._render( rx[ ::half ].copy(), ry[ half::step ].copy() )
+            plane[ ::step, half::step ] = self._render( rx[ half::step ].copy(), ry[ ::step ].copy() )
+            step = half
+
+    def batch(self, cs):
+        """Compute the julia plane for every constant in cs over this plane's grid, in a single pass.  The result
+        is an int32 array of shape (len(cs), ylen, xlen), where frame k holds the counts that set_f(cs[k]) would
+        give with the 'direct' method and this plane's maximum loop count.  The grid is built once for the whole
+        batch, the kernel is not recompiled, and when self.workers is not 1 the rows of all the frames are shared
+        out across cores.  The plane itself is left as it is.
+        """
+        cs = np.asarray( cs, dtype=np.complex128 ).ravel()
+        rx = np.linspace( self.xmin, self.xmax, self.xlen )
+        ry = np.linspace( self.ymin, self.ymax, self.ylen )
+        frames = np.empty( ( len( cs ), self.ylen, self.xlen ), dtype=np.int32 )
+        if self.engine == 'numpy':
+            for frame, c in zip( frames, cs ):
+                _numpy_fill( rx, ry, c, self.max, frame, self.precision )
+            return frames
+        _run_kernel( _julia_batch, _julia_batch_parallel, self.workers, _escape( self.cycles, self.precision ), rx, ry, cs, self.max, frames )
+        return frames
+
+    def show(self, chosenmap=None):
         """This method plots an image of the contents of the 2D complex plane.  The numbers in the plane
         are treated as gray-scale in matplotlib.imshow(), with an optional color map being used to turn
-        the gray-scale into various color combinations.
+        the gray-scale into various color combinations.  The default color map is matplotlib's 'hot'.
         """
+        import matplotlib.pyplot as plt
+        if chosenmap is None:
+            chosenmap = plt.cm.hot
         plt.clf()
-        plt.imshow(self.plane.as_matrix(), cmap=chosenmap, interpolation='bicubic', extent=(self.xmin, self.xmax, self.ymin, self.ymax))
+        plt.imshow(self.plane, cmap=chosenmap, interpolation='bicubic', extent=(self.xmin, self.xmax, self.ymin, self.ymax))
         plt.title( 'c = '+str(self.c) )
         plt.show()
 
+    def to_image(self, filename, cmap='hot', level=1):
+        """Write the plane to filename as a PNG image, with ymax along the top.  Each count from 0 to self.max is
+        given a colour from cmap once, in a lookup table, and the image is then made by indexing that table with
+        the counts, one band of rows at a time, each band being compressed and written out before the next is
+        read.  That is much faster than drawing the plane with show(), needs no figure or display, and works just
+        as well on a memory-mapped plane too large to read into memory, such as one attached with fromTiled().
+        cmap is the name of a matplotlib colormap, a matplotlib Colormap, or an array of RGB colours from 0 to 255
+        (see colormap_table()).  A plane of smooth values (output='smooth') is spread over a finer table of
+        1024 colours from 0 to self.max, so that the image keeps the gradations between the counts.  level is
+        the zlib compression level (see write_png()).
+        """
+        if self.output == 'smooth':
+            levels = _SMOOTH_LEVELS - 1
+            table = colormap_table( cmap, levels )
+            scale = levels/float( max( 1, self.max ) )
+            colour = lambda band: table.take( np.clip( band*scale, 0, levels ).astype( np.intp ), axis=0 )
+        else:
+            table = colormap_table( cmap, self.max )
+            #  take() is a good deal faster than fancy indexing when picking whole rows of the table
+            colour = lambda band: table.take( np.clip( band, 0, self.max ).astype( np.intp ), axis=0 )
+        with open( filename, 'wb' ) as pngfile:
+            write_png( pngfile, ( colour( band ) for band in self._bandsFromTop() ), self.xlen, self.ylen, level )
+
+    def _ymaxFirst(self):
+        """True if row 0 of the plane is ymax rather than ymin, as _rowY() lays the rows out."""
+        return self._rowY( 0 ) > self._rowY( self.ylen - 1 )
+
+    def _bandsFromTop(self):
+        """Yield the plane a band of rows at a time, starting from the top (ymax) row, which is the first or the
+        last row of the plane (see _ymaxFirst())."""
+        if self._ymaxFirst():
+            for start in range( 0, self.ylen, _CHUNK_ROWS ):
+                yield np.asarray( self.plane[ start:start + _CHUNK_ROWS ] )
+            return
+        for stop in range( self.ylen, 0, -_CHUNK_ROWS ):
+            yield np.asarray( self.plane[ max( 0, stop - _CHUNK_ROWS ):stop ] )[ ::-1 ]
+
     def set_f(self, c, max=100):
         """This method is used to set the transformation function in the ComplexPlane for this JuliaPlane.
         The function julia is currently not a member of JuliaPlane.
@@ -126,14 +734,122 @@ class JuliaPlane(ComplexPlaneNP):
         of 100.
         """
         self.c = c  # keep a copy for the CSV and JSON output
+        self.max = max
         self.f = julia(c, max)
         self.refresh()
 
 
+    def fromTiled( self, filename ):
+        """Attach this julia plane to a plane rendered by render_tiled().  The parameters are read from the
+        file's sidecar, and the plane itself is opened as a read-only memory-mapped array, so nothing is
+        loaded into memory or recomputed; a plane whose row 0 is ymax, such as JuliaPlaneNV, gets a view of it
+        turned over.  A ValueError is raised if some tiles have not been rendered yet."""
+        params, done = _open_tiled( filename, 'r' )
+        if done is None or not done.all():
+            raise ValueError( '%s is not completely rendered, run render_tiled() on it again to finish it' % filename )
+
+        self._setParameters( params )
+        self.plane = np.load( filename, mmap_mode='r' )
+        if self._ymaxFirst():
+            #  the file is written ymin first, so turn it over, as a view, for a plane that starts at ymax
+            self.plane = self.plane[ ::-1 ]
+        #  only the counts are rendered, so the smooth values and modulus of the previous window no longer apply
+        self.output = 'counts'
+        self.withModulus = False
+        self.smooth = None
+        self.modulus = None
+
+
+    def _parameters(self):
+        """Return the parameters needed to recreate this julia plane as a dictionary."""
+        return { "xmin":self.xmin, "xmax":self.xmax, "xlen":self.xlen, "ymin":self.ymin, "ymax":self.ymax, "ylen":self.ylen,
+                 "creal":complex( self.c ).real, "cimaginary":complex( self.c ).imag, "max":self.max }
+
+
+    def _setParameters(self, params):
+        """Set this julia plane's parameters from a dictionary made by _parameters(), without refreshing the plane."""
+        self.xmin  = params[ 'xmin' ]
+        self.xmax  = params[ 'xmax' ]
+        self.xlen  = int( params[ 'xlen' ] )
+        self.ymin  = params[ 'ymin' ]
+        self.ymax  = params[ 'ymax' ]
+        self.ylen  = int( params[ 'ylen' ] )
+        self.c     = params[ 'creal' ] + params[ 'cimaginary' ]*1j
+        self.max   = int( params[ 'max' ] )
+        self.xstep = (self.xmax - self.xmin)/(self.xlen - 1)
+        self.ystep = (self.ymax - self.ymin)/(self.ylen - 1)
+        self.f     = julia( self.c, self.max )
+
+
+    def toBinary( self, filename, compress=False ):
+        """Output the julia plane and all parameters needed to recreate it in a compact binary format.
+        The file starts with the 8 byte tag JULIAPLN and a 4 byte little-endian length, followed by a JSON
+        header with the parameters and the layout of the plane, including whether row 0 is ymin or ymax and
+        whether the plane holds counts or smooth values.  The header is padded so that the plane's
+        raw C-ordered buffer starts on a 64 byte boundary.  If compress is True the buffer is zlib compressed,
+        which makes the file smaller but means fromBinary() has to decompress it instead of mapping it.
+        """
+        import json
+        header = self._parameters()
+        header[ "dtype" ] = self.plane.dtype.str
+        header[ "compressed" ] = bool( compress )
+        header[ "ymaxFirst" ] = bool( self._ymaxFirst() )
+        header[ "output" ] = 'smooth' if self.output == 'smooth' else 'counts'
+        text = json.dumps( header ).encode( 'ascii' )
+        #  pad the header with spaces so that the plane's buffer is aligned
+        text += b' ' * ( -( len( _BINARY_TAG ) + 4 + len( text ) ) % 64 )
+
+        with open( filename, 'wb' ) as binfile:
+            binfile.write( _BINARY_TAG )
+            binfile.write( struct.pack( '<I', len( text ) ) )
+            binfile.write( text )
+            if compress:
+                #  compress a band of rows at a time, so a memory-mapped plane is never read in all at once
+                packer = zlib.compressobj()
+                for row in range( 0, self.ylen, _CHUNK_ROWS ):
+                    binfile.write( packer.compress( np.ascontiguousarray( self.plane[ row:row+_CHUNK_ROWS ] ) ) )
+                binfile.write( packer.flush() )
+            else:
+                for row in range( 0, self.ylen, _CHUNK_ROWS ):
+                    np.ascontiguousarray( self.plane[ row:row+_CHUNK_ROWS ] ).tofile( binfile )
+
+
+    def fromBinary( self, filename ):
+        """Read in a julia plane saved by toBinary().  Unlike fromCSV() and fromJSON(), the saved plane is used as
+        it is and nothing is recomputed.  An uncompressed plane is opened as a read-only memory-mapped array, so
+        no copy of it is made; a compressed plane is decompressed into memory.  A plane saved with its rows the
+        other way up from this one, such as a JuliaPlaneNV's read into a JuliaPlane, is turned over, as a view."""
+        import json
+        with open( filename, 'rb' ) as binfile:
+            if binfile.read( len( _BINARY_TAG ) ) != _BINARY_TAG:
+                raise ValueError( '%s is not a binary julia plane file' % filename )
+            length, = struct.unpack( '<I', binfile.read( 4 ) )
+            header = json.loads( binfile.read( length ).decode( 'ascii' ) )
+            offset = len( _BINARY_TAG ) + 4 + length
+            shape = ( int( header[ 'ylen' ] ), int( header[ 'xlen' ] ) )
+            if header[ 'compressed' ]:
+                plane = np.frombuffer( zlib.decompress( binfile.read() ), dtype=header[ 'dtype' ] ).reshape( shape )
+            else:
+                plane = np.memmap( filename, dtype=header[ 'dtype' ], mode='r', offset=offset, shape=shape )
+        self._setParameters( header )
+        #  files written before the row order and output were recorded are ymin first and hold counts
+        if header.get( 'ymaxFirst', False ) != self._ymaxFirst():
+            plane = plane[ ::-1 ]
+        self.plane = plane
+        self.output = header.get( 'output', 'counts' )
+        #  only the plane is saved, so the smooth values and modulus of the previous window no longer apply
+        self.withModulus = False
+        self.smooth = None
+        self.modulus = None
+
+
     def toCSV( self, filename ):
         """Output the contents of the julia plane and all parameters needed to recreate it in CSV format
         Created with the help of https://docs.python.org/3/library/csv.html
+        The plane is streamed to the file a band of rows at a time, so a memory-mapped plane is never read in
+        all at once.
         """
+        import csv
         #  open the file for writing
         with open(filename, 'w', newline='' ) as csvfile:
             writer = csv.writer( csvfile, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL )
@@ -143,9 +859,14 @@ class JuliaPlane(ComplexPlaneNP):
             writer.writerow( [ '', self.xmin, self.xmax, self.xlen, self.ymin, self.ymax, self.ylen, self.c ] )
             # blank row
             writer.writerow( [ 'JuliaPlane Contents' ] )
-            #  write out the contents of the plane
-            for row_i in self.plane.iterrows():
-                writer.writerows( row_i[1:self.xlen] )
+            #  write out the contents of the plane.  Integer counts are formatted by numpy a band at a time,
+            #  using the same line ending as the csv writer; anything else goes through the csv writer itself
+            for row in range( 0, self.ylen, _CHUNK_ROWS ):
+                block = np.asarray( self.plane[ row:row+_CHUNK_ROWS ] )
+                if block.dtype.kind in 'iu':
+                    np.savetxt( csvfile, block, fmt='%d', delimiter=',', newline=writer.dialect.lineterminator )
+                else:
+                    writer.writerows( block.tolist() )
 
             #  we're done, clean up the file
             csvfile.close()
@@ -155,6 +876,7 @@ class JuliaPlane(ComplexPlaneNP):
         """Read in the contents of a csv file to rebuild a save julia plane.  We are only interested in
         the parameters necessary to reconstruct the plane, we do not need to read the contents of the plane
         itself"""
+        import csv
         #  open the file for reading
         with open( filename, newline='' ) as csvfile:
             reader = csv.reader( csvfile, delimiter=',', quotechar='"' )
@@ -187,21 +909,25 @@ class JuliaPlane(ComplexPlaneNP):
     def toJSON( self, filename ):
         """Output the contents of the julia plane and all parameters needed to recreate it in JSON encoded format
         Created with the help of http://stackoverflow.com/questions/12309269/how-do-i-write-json-data-to-a-file-in-python
+        The file holds one object, with the parameters under "JuliaPlaneParameters" and row n of the plane
+        under "JuliaPlaneContentsn" as { row label: [ values ] }.  Rather than building that object in memory,
+        it is written out piece by piece, a band of rows at a time.
         """
+        import json
         #  open the file for writing
         with open( filename, 'w') as jsonfile:
             #  output the parameters needed to recreate the plane
-            data = { "JuliaPlaneParameters": { "xmin":self.xmin, "xmax":self.xmax, "xlen":self.xlen, "ymin":self.ymin, "ymax":self.ymax, "ylen":self.ylen, "creal":self.c.real, "cimaginary":self.c.imag }}
+            params = { "xmin":self.xmin, "xmax":self.xmax, "xlen":self.xlen, "ymin":self.ymin, "ymax":self.ymax, "ylen":self.ylen, "creal":complex( self.c ).real, "cimaginary":complex( self.c ).imag }
+            jsonfile.write( '{"JuliaPlaneParameters":' + json.dumps( params, sort_keys=True, separators=(',', ':') ) )
 
             #  handle the output of the plane contents
-            mat = self.plane.as_matrix()
-            for row in range( 0, self.xlen ):
-                print( mat[ row ] )
-                l = mat[ row ].tolist()
-                data[ "JuliaPlaneContents" + str( row )] = { self.plane.index[ row ]:  l }
-
-            #  write the accummulated dictionary to the JSON file
-            json.dump(data, jsonfile, indent=4, sort_keys=True, separators=(',', ':'))
+            for band in range( 0, self.ylen, _CHUNK_ROWS ):
+                block = np.asarray( self.plane[ band:band+_CHUNK_ROWS ] ).tolist()
+                for offset, values in enumerate( block ):
+                    row = band + offset
+                    label = str( self._rowY( row ) )
+                    jsonfile.write( ',\n"JuliaPlaneContents%d":{%s:%s}' % ( row, json.dumps( label ), json.dumps( values, separators=(',', ':') ) ) )
+            jsonfile.write( '}\n' )
 
             #  we're done, clean up the file
             jsonfile.close()
@@ -212,6 +938,7 @@ class JuliaPlane(ComplexPlaneNP):
         the parameters necessary to reconstruct the plane, we do not need to read the contents of the plane
         itself"""
         #  open the file for reading
+        import json
         from pprint import pprint
 
         #  open and read in the json file, with help from:  http://stackoverflow.com/questions/2835559/parsing-values-from-a-json-file-in-python
@@ -251,10 +978,24 @@ class JuliaPlaneNV(JuliaPlane):
         The function for this plane is then reset to a new function, and the values re-generated.
         Note that since this function was intially created, the f parameter was added to ComplexPlaneNP's
         creator, but this code was not updated to take advantage of the passed parameter change.
+        The options JuliaPlane's creator takes are given their defaults, for the methods this plane inherits.
         """
         #  set the function and re-compute the plane's values
         f = juliaNV(c, maxLoop)
         self.c = c
+        self.cache = None
+        self.cycles = False
+        self.method = 'direct'
+        self.precision = None
+        self.output = 'counts'
+        self.withModulus = False
+        self.adaptive = None
+        self.rounds = []
+        self.engine = 'numba' if _NUMBA else 'numpy'
+        self.stats = None
+        self.schedule = 'static'
+        self.smooth = None
+        self.modulus = None
         ComplexPlaneNP.__init__(self, newXmin, newXmax, newXlen, newYmin, newYmax, newYlen, f, maxLoop)
 
     def refresh(self):
@@ -262,14 +1003,42 @@ class JuliaPlaneNV(JuliaPlane):
         For every point (x + y*1j) in self.plane, replace
         the point with the value self.f(x + y*1j). 
         """
-        planeArray = np.zeros([self.xlen,self.ylen])
+        planeArray = np.zeros([self.ylen,self.xlen])
         for xpos in range(self.xlen):
             for ypos in range(self.ylen):
                 #  compute the value at each of the coordinate points in the plane
                 planeArray[(self.ylen-ypos-1),xpos] = self.f( (xpos*self.xstep+self.xmin) + (ypos*self.ystep+self.ymin)*1j )
-        ylabels = [str(self.ymax-ypos*self.ystep) for ypos in range(self.ylen)]
-        xlabels = [str(xpos*self.xstep+self.xmin) for xpos in range(self.xlen)]
-        self.plane = pd.DataFrame(planeArray, index=ylabels, columns=xlabels)
+        self.plane = planeArray
+
+    def _shift(self, dx, dy, newXmin, newXmax, newYmin, newYmax):
+        """This non-vectorized plane is kept as the slow reference, with its rows in the opposite order to the
+        vectorized planes, so pan() and zoom() simply recompute the whole plane at the new window."""
+        self.xmin = newXmin
+        self.xmax = newXmax
+        self.ymin = newYmin
+        self.ymax = newYmax
+        self.xstep = (self.xmax - self.xmin)/(self.xlen - 1)
+        self.ystep = (self.ymax - self.ymin)/(self.ylen - 1)
+        self.refresh()
+
+    def _rowY(self, ypos):
+        """Return the y coordinate of row ypos of the plane.  Row 0 of this plane is ymax."""
+        return self.ymax-ypos*self.ystep
+
+    def batch(self, cs):
+        """Compute the frames as JuliaPlane.batch() does, turned over so that row 0 of each is ymax, as it is in this plane."""
+        return JuliaPlane.batch( self, cs )[ :, ::-1 ]
+
+    def progressive(self, levels=5, callback=None):
+        """The previews are samples of a plane laid out ymin first, unlike this one, so a ValueError is raised as
+        soon as this is called, rather than on the first preview."""
+        raise ValueError( 'progressive() builds planes with ymin in row 0, which JuliaPlaneNV does not use' )
+
+    def renderShared(self, processes=None, bandRows=None):
+        """Regenerate the plane as JuliaPlane.renderShared() does, and return it turned over so that row 0 is ymax.
+        The plane is a view of the shared block, so it is still not copied."""
+        self.plane = JuliaPlane.renderShared( self, processes, bandRows )[ ::-1 ]
+        return self.plane
 
     def set_f(self, c, max=100):
         """This method is used to set the transformation function in the ComplexPlane for this JuliaPlane.
@@ -278,17 +1047,969 @@ class JuliaPlaneNV(JuliaPlane):
         of 100.
         """
         self.c = c  # keep a copy for the CSV and JSON output
+        self.max = max
         self.f = juliaNV(c, max)
         self.refresh()
 
 
+class RenderStats(object):
+    """This is the Class RenderStats.  It collects the measurements JuliaPlane makes when it is created with
+    stats=True (or with a RenderStats), so that they can be looked at or passed on to a metrics system.
+
+    seconds and calls hold the total time spent in, and the number of runs of, each phase:  'grid' (the
+    coordinate axes), 'compile' (a computation that had to compile kernels or load them from numba's cache),
+    'kernel' (any other computation of the plane), 'tally' (the counting below), and 'labels' and 'frame' (the
+    row and column names and the pandas DataFrame, built when plane.frame is first used).  refreshes counts the
+    calls to refresh().
+
+    points, escaped, interior and iterations add up, over every plane tallied, the points, the points that
+    escaped (including the ones that started outside the circle of radius 2), the points that reached the max
+    loop count, and the loops those counts stand for:  count + 1 for a point that escaped, 0 for one that
+    started outside, and max for one that did not escape.  With cycles or the 'subdivide' method less work is
+    actually done, as points are cut short or filled in without being computed.
+
+    Each hook in hooks is called as hook(phase, seconds, stats) when a phase finishes.
+    """
+
+    def __init__(self, hooks=()):
+        self.hooks = list( hooks )
+        self.reset()
+
+    def reset(self):
+        """Set every measurement back to zero, keeping the hooks."""
+        self.seconds = {}
+        self.calls = {}
+        self.refreshes = 0
+        self.points = 0
+        self.escaped = 0
+        self.interior = 0
+        self.iterations = 0
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the body of a with statement as a run of the phase name."""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.record( name, time.perf_counter() - start )
+
+    def record(self, name, seconds):
+        """Add a run of seconds to the phase name, and tell the hooks."""
+        self.seconds[ name ] = self.seconds.get( name, 0. ) + seconds
+        self.calls[ name ] = self.calls.get( name, 0 ) + 1
+        for hook in self.hooks:
+            hook( name, seconds, self )
+
+    def tally(self, counts, rx, ry, c, max):
+        """Add the points of a plane of counts, computed for the axes rx and ry, the constant c and the max loop
+        count max, to the totals.  A count of 0 is either a point that escaped on its first loop or one that
+        never escaped, and a count of 1 is either a point that escaped on its second loop or one that started
+        outside, so those are told apart by looking at the starting point and its first loop again.  The plane
+        is looked at _CHUNK_ROWS rows at a time, so the arrays made for it stay small however large it is."""
+        c = complex( c )
+        for start in range( 0, len( ry ), _CHUNK_ROWS ):
+            band = ry[ start:start + _CHUNK_ROWS ]
+            self._tallyBand( np.asarray( counts[ start:start + _CHUNK_ROWS ] ).ravel(), rx, band, c, max )
+
+    def _tallyBand(self, counts, rx, ry, c, max):
+        """Add the flattened counts of the band of rows at ry to the totals (see tally())."""
+        x = np.tile( rx.astype( np.float64 ), len( ry ) )
+        y = np.repeat( ry.astype( np.float64 ), len( rx ) )
+        outside = ~_numpy_inside( x, y, x*x + y*y, True )
+        zero = np.flatnonzero( ( counts == 0 ) & ~outside )
+        if max > 0:
+            #  one loop of z = z**2 + c, done the same way as _numpy_counts() does it
+            x1 = x[ zero ]*x[ zero ] - y[ zero ]*y[ zero ] + c.real
+            y1 = y[ zero ]*x[ zero ]*2 + c.imag
+            first = np.count_nonzero( ~_numpy_inside( x1, y1, x1*x1 + y1*y1, True ) )
+        else:
+            first = 0
+        interior = len( zero ) - first
+        later = ~outside & ( counts > 0 )
+        #  int() keeps the totals plain python numbers rather than numpy ones, so toDict() can go straight to JSON
+        self.points += len( counts )
+        self.escaped += int( len( counts ) - interior )
+        self.interior += int( interior )
+        self.iterations += int( counts[ later ].sum( dtype=np.int64 ) + np.count_nonzero( later ) + first + interior*max )
+
+    def toDict(self):
+        """Return the measurements as a dictionary of plain python values."""
+        return { "seconds":dict( self.seconds ), "calls":dict( self.calls ), "refreshes":self.refreshes, "points":self.points,
+                 "escaped":self.escaped, "interior":self.interior, "iterations":self.iterations }
+
+
+class TileCache(object):
+    """This is the Class TileCache.  It holds tiles of computed planes, keyed on everything that decides their
+    contents (the constant c, the maximum loop count, the window and the resolution of the tile), so that planes
+    asking for the same tiles over and over do not have to compute them again.
+
+    The tiles are kept in memory up to a budget of maxBytes, and when the budget is exceeded the least recently
+    used tiles are dropped.  If a directory is given, every tile is also saved there as a .npy file, and a tile
+    missing from memory is looked for on disk before it is computed, so the directory acts as a larger, slower
+    second level that survives between processes.
+
+    The counters hits, misses and diskHits report how the cache is doing; diskHits are the hits that had to
+    be read back from the directory, and are also counted in hits.
+    """
+
+    def __init__(self, maxBytes=256*2**20, directory=None, tileSize=256):
+        """Create an empty cache holding at most maxBytes of tiles in memory, optionally backed by directory,
+        for planes split into tiles of tileSize by tileSize points."""
+        self.maxBytes = maxBytes
+        self.directory = directory
+        self.tileSize = int( tileSize )
+        self.tiles = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.diskHits = 0
+        if directory is not None:
+            os.makedirs( directory, exist_ok=True )
+
+    def get(self, key):
+        """Return the tile stored under key, or None if it is neither in memory nor on disk."""
+        tile = self.tiles.get( key )
+        if tile is not None:
+            self.tiles.move_to_end( key )
+            self.hits += 1
+            return tile
+        if self.directory is not None and os.path.exists( self._path( key ) ):
+            tile = np.load( self._path( key ) )
+            self._remember( key, tile )
+            self.hits += 1
+            self.diskHits += 1
+            return tile
+        self.misses += 1
+        return None
+
+    def put(self, key, tile):
+        """Store tile under key, in memory and, if the cache has a directory, on disk."""
+        tile = np.array( tile )
+        if self.directory is not None:
+            #  write to a temporary name first, so another process never sees half a tile
+            path = self._path( key )
+            with open( path + '.tmp', 'wb' ) as tilefile:
+                np.save( tilefile, tile )
+            os.replace( path + '.tmp', path )
+        self._remember( key, tile )
+
+    def clear(self):
+        """Drop every tile held in memory and reset the counters.  Tiles saved on disk are kept."""
+        self.tiles.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.diskHits = 0
+
+    def _remember(self, key, tile):
+        """Keep tile in memory as the most recently used entry, dropping the least recently used ones to stay
+        within the budget.  A tile bigger than the whole budget is not kept in memory at all."""
+        if tile.nbytes > self.maxBytes:
+            return
+        tile.flags.writeable = False
+        if key in self.tiles:
+            self.bytes -= self.tiles.pop( key ).nbytes
+        self.tiles[ key ] = tile
+        self.bytes += tile.nbytes
+        while self.bytes > self.maxBytes:
+            oldKey, oldTile = self.tiles.popitem( last=False )
+            self.bytes -= oldTile.nbytes
+
+    def _path(self, key):
+        """The file in self.directory for the tile stored under key."""
+        return os.path.join( self.directory, hashlib.sha1( repr( key ).encode( 'ascii' ) ).hexdigest() + '.npy' )
+
+
+@nb.njit(nb.int32(nb.complex128, nb.complex128, nb.int64), cache=True)
+def _escape_time(z, c, max):
+    """This is the escape-time calculation for a single point z, shared by every compiled kernel in this file
+    so that they all produce the same counts.  See julia() for the meaning of the return value.
+    """
+    # check to see if the input is already too big
+    if abs( z ) <= 2:
+        n = 0
+        while abs(z)<=2:
+            #  perform the operation
+            z = z**2 + c
+            #  have we exceeded our max loop count-1?
+            if n >= max:
+                n = 1
+                break
+            #  count the number of times through the loop
+            n+=1
+        n -= 1  # subtract one to count the total loops *before* exceeding 2, also reports 0 if max loop reached
+    else:
+        #  report input too big
+        n = 1
+    return n
+
+
+@nb.njit(nb.int32(nb.complex128, nb.complex128, nb.int64), cache=True)
+def _escape_time_cycles(z, c, max):
+    """This is the escape-time calculation for a single point z with periodicity checking, giving exactly the
+    same counts as _escape_time().  Every so often the current z is saved (Brent's method, with the gap between
+    saves doubling each time), and if the orbit later lands exactly on the saved value it is repeating itself
+    and can never escape, so the loop stops at once and reports 0 as if the max loop count had been reached.
+    Points inside the julia set usually settle onto such a cycle long before max, which is where the time goes
+    in windows that are mostly interior.
+    """
+    # check to see if the input is already too big
+    if abs( z ) <= 2:
+        n = 0
+        saved = z
+        steps = 0
+        gap = 8
+        while abs(z)<=2:
+            #  perform the operation
+            z = z**2 + c
+            #  have we exceeded our max loop count-1, or come back round to a value we have already seen?
+            if n >= max or z == saved:
+                n = 1
+                break
+            #  count the number of times through the loop
+            n+=1
+            #  move the saved value along, leaving twice as long before the next move
+            steps += 1
+            if steps == gap:
+                saved = z
+                steps = 0
+                gap *= 2
+        n -= 1  # subtract one to count the total loops *before* exceeding 2, also reports 0 if max loop reached
+    else:
+        #  report input too big
+        n = 1
+    return n
+
+
+@nb.njit(cache=True)
+def _escape_time_smooth(z, c, max):
+    """This is the escape-time calculation for a single point z, as in _escape_time(), that also returns the
+    normalized iteration count and the final |z|, as the tuple (count, smooth, |z|).  The smooth value is
+    count + 1 - log2(log2(|z|)) for a point that escapes, with z the first value past 2, and 0 for a point that
+    reaches the max loop count.
+    """
+    r = abs( z )
+    reachedMax = False
+    if r <= 2:
+        n = 0
+        while r <= 2:
+            #  perform the operation
+            z = z**2 + c
+            #  have we exceeded our max loop count-1?
+            if n >= max:
+                n = 1
+                reachedMax = True
+                break
+            #  count the number of times through the loop
+            n += 1
+            r = abs( z )
+        n -= 1  # subtract one to count the total loops *before* exceeding 2, also reports 0 if max loop reached
+        r = abs( z )
+    else:
+        #  report input too big
+        n = 1
+    #  the last z of a point that reached max may already be past 2, but the point did not escape in time
+    if reachedMax:
+        return n, 0.0, r
+    return n, n + 1 - math.log2( math.log2( r ) ), r
+
+
+@nb.vectorize([nb.int32(nb.complex128, nb.complex128, nb.int64)], cache=True)
+def _julia_kernel(z, c, max):
+    """This is the compiled escape-time kernel used by julia().  Unlike the function returned by julia(), the
+    constant c and the maximum loop count are passed in at run time, so the kernel is compiled once (and cached
+    on disk by numba) instead of once for every new value of c.
+    """
+    return _escape_time( z, c, max )
+
+
+@nb.njit(inline='always')
+def _inside(zr, zi, four, exact):
+    """True while the point zr + zi*1j has not escaped, judged by comparing |z|**2 with four.  With exact set,
+    the few values of |z|**2 that are too close to 4 to call after rounding are settled with math.hypot(),
+    the same test abs(z) <= 2 makes, so the result always agrees with _escape_time()."""
+    m = zr*zr + zi*zi
+    if not exact:
+        return m <= four
+    if m < 3.9999999:
+        return True
+    if m > 4.0000001:
+        return False
+    return math.hypot( zr, zi ) <= 2.0
+
+
+@nb.njit(inline='always')
+def _split_point(zr, zi, cr, ci, two, four, exact, max):
+    """This is the escape-time calculation for a single point with the real and imaginary parts of z held
+    separately, in whatever precision they are passed in.  See julia() for the meaning of the return value."""
+    if _inside( zr, zi, four, exact ):
+        n = 0
+        while _inside( zr, zi, four, exact ):
+            #  perform the operation z = z**2 + c on the two parts
+            t = zr*zr - zi*zi + cr
+            zi = two*zr*zi + ci
+            zr = t
+            if n >= max:
+                n = 1
+                break
+            n += 1
+        n -= 1
+    else:
+        n = 1
+    return n
+
+
+@nb.njit(cache=True)
+def _escape_time_split64(z, c, max):
+    """The split real/imaginary calculation in double precision, with the same arguments and counts as _escape_time()."""
+    return _split_point( z.real, z.imag, c.real, c.imag, 2.0, 4.0, True, max )
+
+
+@nb.njit(cache=True)
+def _escape_time_split32(z, c, max):
+    """The split real/imaginary calculation in single precision, with the same arguments as _escape_time()."""
+    return _split_point( np.float32( z.real ), np.float32( z.imag ), np.float32( c.real ), np.float32( c.imag ), np.float32( 2 ), np.float32( 4 ), False, max )
+
+
+#  how many points of a row the split kernels iterate side by side
+_LANES = 8
+
+
+@nb.njit(cache=True)
+def _split_row(rx, y, cr, ci, two, four, exact, max, out):
+    """Fill out[j] with the escape-time count of the point rx[j] + y*1j, _LANES points at a time.  Every lane is
+    stepped on every pass, whether or not its point has escaped, so the loop that does the arithmetic has no
+    branches and LLVM can turn it into SIMD instructions; the bookkeeping of which lanes are finished is kept
+    in a separate loop.  The counts are the same as from _split_point()."""
+    zr = np.empty( _LANES, rx.dtype )
+    zi = np.empty( _LANES, rx.dtype )
+    result = np.empty( _LANES, np.int32 )
+    active = np.empty( _LANES, np.bool_ )
+    for start in range( 0, rx.shape[0], _LANES ):
+        width = min( _LANES, rx.shape[0] - start )
+        running = 0
+        for lane in range( _LANES ):
+            if lane < width:
+                zr[lane] = rx[start + lane]
+                zi[lane] = y
+            else:
+                zr[lane] = 0
+                zi[lane] = 0
+            active[lane] = lane < width and _inside( zr[lane], zi[lane], four, exact )
+            result[lane] = 1
+            if active[lane]:
+                running += 1
+        n = 0
+        while running > 0:
+            #  perform the operation z = z**2 + c on every lane
+            for lane in range( _LANES ):
+                t = zr[lane]*zr[lane] - zi[lane]*zi[lane] + cr
+                zi[lane] = two*zr[lane]*zi[lane] + ci
+                zr[lane] = t
+            #  retire the lanes that reached the max loop count or escaped on this pass
+            running = 0
+            for lane in range( _LANES ):
+                if active[lane]:
+                    if n >= max:
+                        result[lane] = 0
+                        active[lane] = False
+                    elif not _inside( zr[lane], zi[lane], four, exact ):
+                        result[lane] = n
+                        active[lane] = False
+                    else:
+                        running += 1
+            n += 1
+        for lane in range( width ):
+            out[start + lane] = result[lane]
+
+
+@nb.njit(cache=True)
+def _split_rows(rx, ry, cr, ci, two, four, exact, max, out):
+    """Fill out[i, j] with the escape-time count of the point rx[j] + ry[i]*1j with the split kernel, on a single core."""
+    for i in range(ry.shape[0]):
+        _split_row( rx, ry[i], cr, ci, two, four, exact, max, out[i] )
+
+
+@nb.njit(parallel=True, cache=True)
+def _split_rows_parallel(rx, ry, cr, ci, two, four, exact, max, out):
+    """Fill out[i, j] with the escape-time count of the point rx[j] + ry[i]*1j with the split kernel, with the
+    rows shared out across numba's threads."""
+    for i in nb.prange(ry.shape[0]):
+        _split_row( rx, ry[i], cr, ci, two, four, exact, max, out[i] )
+
+
+#  the per-point calculations the kernels below can use, chosen by the integer mode they take as their first
+#  argument (see _escape()).  A mode rather than the compiled function itself is passed so that each kernel
+#  has one set of argument types, and so one entry in numba's on-disk cache, whichever calculation is used.
+_DIRECT = 0
+_CYCLES = 1
+_SPLIT64 = 2
+_SPLIT32 = 3
+
+
+@nb.njit(inline='always')
+def _escape_point(mode, z, c, max):
+    """Return the escape-time count of the point z from the calculation chosen by mode."""
+    if mode == _CYCLES:
+        return _escape_time_cycles( z, c, max )
+    if mode == _SPLIT64:
+        return _escape_time_split64( z, c, max )
+    if mode == _SPLIT32:
+        return _escape_time_split32( z, c, max )
+    return _escape_time( z, c, max )
+
+
+@nb.njit(cache=True)
+def _julia_rows(mode, rx, ry, c, max, out):
+    """Fill out[i, j] with the escape-time count of the point rx[j] + ry[i]*1j, one row after another on a
+    single core.  The coordinates are formed inside the loop, so no grid of points is ever allocated."""
+    for i in range(ry.shape[0]):
+        for j in range(rx.shape[0]):
+            out[i, j] = _escape_point( mode, complex( rx[j], ry[i] ), c, max )
+
+
+@nb.njit(parallel=True, cache=True)
+def _julia_rows_parallel(mode, rx, ry, c, max, out):
+    """Fill out[i, j] with the escape-time count of the point rx[j] + ry[i]*1j, with the rows shared out across
+    numba's threads.  Every point goes through the same _escape_point() call as the serial kernel, so the output
+    is identical.
+    """
+    for i in nb.prange(ry.shape[0]):
+        for j in range(rx.shape[0]):
+            out[i, j] = _escape_point( mode, complex( rx[j], ry[i] ), c, max )
+
+
+@nb.njit(cache=True)
+def _smooth_rows(rx, ry, c, max, counts, smooth, modulus, keepCounts, keepSmooth, keepModulus):
+    """Fill counts[i, j], smooth[i, j] and modulus[i, j] with the count, the normalized iteration count and the
+    final |z| of the point rx[j] + ry[i]*1j, each only when keepCounts, keepSmooth and keepModulus are set, all
+    from one call to _escape_time_smooth() per point."""
+    for i in range(ry.shape[0]):
+        for j in range(rx.shape[0]):
+            n, nu, r = _escape_time_smooth( complex( rx[j], ry[i] ), c, max )
+            if keepCounts:
+                counts[i, j] = n
+            if keepSmooth:
+                smooth[i, j] = nu
+            if keepModulus:
+                modulus[i, j] = r
+
+
+@nb.njit(parallel=True, cache=True)
+def _smooth_rows_parallel(rx, ry, c, max, counts, smooth, modulus, keepCounts, keepSmooth, keepModulus):
+    """The same as _smooth_rows(), with the rows shared out across numba's threads."""
+    for i in nb.prange(ry.shape[0]):
+        for j in range(rx.shape[0]):
+            n, nu, r = _escape_time_smooth( complex( rx[j], ry[i] ), c, max )
+            if keepCounts:
+                counts[i, j] = n
+            if keepSmooth:
+                smooth[i, j] = nu
+            if keepModulus:
+                modulus[i, j] = r
+
+
+@nb.njit(inline='always')
+def _adaptive_point(points, c, done, limit, index, counts, alive, p):
+    """Carry point p of an adaptive round on from done loops to at most limit (see _adaptive_round())."""
+    z = points[p]
+    alive[p] = True
+    if done == 0 and abs( z ) > 2:
+        #  report input too big
+        counts[index[p]] = 1
+        alive[p] = False
+        return
+    n = done
+    while n < limit:
+        z = z**2 + c
+        n += 1
+        if abs( z ) > 2:
+            #  count the loops *before* exceeding 2, as _escape_time() does
+            counts[index[p]] = n - 1
+            alive[p] = False
+            break
+    points[p] = z
+
+
+@nb.njit(cache=True)
+def _adaptive_round(points, c, done, limit, index, counts, alive):
+    """Iterate the packed points, which have all been through done loops already, up to limit loops.  A point
+    that escapes has its count written to counts[index[p]] and alive[p] cleared; the others are left in points,
+    ready for the next round, with alive[p] set."""
+    for p in range(points.shape[0]):
+        _adaptive_point( points, c, done, limit, index, counts, alive, p )
+
+
+@nb.njit(parallel=True, cache=True)
+def _adaptive_round_parallel(points, c, done, limit, index, counts, alive):
+    """The same as _adaptive_round(), with the points shared out across numba's threads."""
+    for p in nb.prange(points.shape[0]):
+        _adaptive_point( points, c, done, limit, index, counts, alive, p )
+
+
+@nb.njit(parallel=True, cache=True)
+def _julia_rows_ordered(mode, rx, ry, c, max, out, order):
+    """Fill the rows of out as _julia_rows_parallel() does, but taking them in the given order:  the k-th row
+    handed out is row order[k].  With numba's chunk size set to 1 each thread takes the next row in order as
+    soon as it is free (see _scheduled_fill())."""
+    for k in nb.prange(order.shape[0]):
+        i = order[k]
+        for j in range(rx.shape[0]):
+            out[i, j] = _escape_point( mode, complex( rx[j], ry[i] ), c, max )
+
+
+@nb.njit(cache=True)
+def _julia_batch(mode, rx, ry, cs, max, out):
+    """Fill out[k, i, j] with the escape-time count of the point rx[j] + ry[i]*1j for the constant cs[k], on a
+    single core."""
+    for k in range(cs.shape[0]):
+        for i in range(ry.shape[0]):
+            for j in range(rx.shape[0]):
+                out[k, i, j] = _escape_point( mode, complex( rx[j], ry[i] ), cs[k], max )
+
+
+@nb.njit(parallel=True, cache=True)
+def _julia_batch_parallel(mode, rx, ry, cs, max, out):
+    """Fill out[k, i, j] with the escape-time count of the point rx[j] + ry[i]*1j for the constant cs[k].  Every
+    row of every frame is a separate piece of work for numba's threads, so a short batch of large frames and a
+    long batch of small frames both keep the threads busy."""
+    rows = ry.shape[0]
+    for n in nb.prange(cs.shape[0]*rows):
+        k = n // rows
+        i = n % rows
+        for j in range(rx.shape[0]):
+            out[k, i, j] = _escape_point( mode, complex( rx[j], ry[i] ), cs[k], max )
+
+
+#  the size of the square blocks the 'subdivide' method starts from, and the size below which it stops
+#  splitting a rectangle and simply computes every point in it
+_SUBDIVIDE_BLOCK = 64
+_SUBDIVIDE_SMALLEST = 6
+
+
+@nb.njit(cache=True)
+def _subdivide_point(mode, rx, ry, c, max, out, i, j):
+    """Return the count at out[i, j], computing it first if it is still marked as not computed (-1)."""
+    if out[i, j] < 0:
+        out[i, j] = _escape_point( mode, complex( rx[j], ry[i] ), c, max )
+    return out[i, j]
+
+
+@nb.njit(cache=True)
+def _subdivide_disk(rx, ry, top, bottom, left, right):
+    """True if the rectangle of rows top..bottom-1 and columns left..right-1 reaches into the disk |z| <= 2.
+    A border of 1s only shows that the points on it start outside the disk, so the inside of such a
+    rectangle cannot be filled in without computing it."""
+    x = min( max( 0.0, min( rx[left], rx[right - 1] ) ), max( rx[left], rx[right - 1] ) )
+    y = min( max( 0.0, min( ry[top], ry[bottom - 1] ) ), max( ry[top], ry[bottom - 1] ) )
+    return x*x + y*y <= 4.0
+
+
+@nb.njit(cache=True)
+def _subdivide_block(mode, rx, ry, c, max, out, y0, y1, x0, x1):
+    """Fill the rectangle of rows y0..y1-1 and columns x0..x1-1 of out with the Mariani-Silver method.  The
+    rectangles still to be done are kept on a stack; the four quarters of a rectangle share their middle row
+    and column, and points already computed are never computed again.  A border of 1s is only filled in when
+    the rectangle lies wholly outside the disk |z| <= 2, as a count of 1 mostly means the point started there,
+    and such a border can surround the whole set."""
+    stack = [ ( y0, y1, x0, x1 ) ]
+    while len( stack ) > 0:
+        top, bottom, left, right = stack.pop()
+        if bottom - top <= _SUBDIVIDE_SMALLEST or right - left <= _SUBDIVIDE_SMALLEST:
+            for i in range( top, bottom ):
+                for j in range( left, right ):
+                    _subdivide_point( mode, rx, ry, c, max, out, i, j )
+            continue
+
+        #  walk the border, checking whether every point on it has the same count
+        value = _subdivide_point( mode, rx, ry, c, max, out, top, left )
+        uniform = True
+        for j in range( left, right ):
+            if _subdivide_point( mode, rx, ry, c, max, out, top, j ) != value:
+                uniform = False
+            if _subdivide_point( mode, rx, ry, c, max, out, bottom - 1, j ) != value:
+                uniform = False
+        for i in range( top + 1, bottom - 1 ):
+            if _subdivide_point( mode, rx, ry, c, max, out, i, left ) != value:
+                uniform = False
+            if _subdivide_point( mode, rx, ry, c, max, out, i, right - 1 ) != value:
+                uniform = False
+
+        if uniform and value == 1 and _subdivide_disk( rx, ry, top, bottom, left, right ):
+            uniform = False
+
+        if uniform:
+            for i in range( top + 1, bottom - 1 ):
+                for j in range( left + 1, right - 1 ):
+                    out[i, j] = value
+        else:
+            middle = ( top + bottom ) // 2
+            centre = ( left + right ) // 2
+            stack.append( ( top, middle + 1, left, centre + 1 ) )
+            stack.append( ( top, middle + 1, centre, right ) )
+            stack.append( ( middle, bottom, left, centre + 1 ) )
+            stack.append( ( middle, bottom, centre, right ) )
+
+
+@nb.njit(cache=True)
+def _subdivide_rows(mode, rx, ry, c, max, out, block):
+    """Fill out with the Mariani-Silver method, one block by block square after another on a single core."""
+    rows = ( ry.shape[0] + block - 1 ) // block
+    cols = ( rx.shape[0] + block - 1 ) // block
+    for n in range( rows*cols ):
+        y0 = ( n // cols )*block
+        x0 = ( n % cols )*block
+        _subdivide_block( mode, rx, ry, c, max, out, y0, min( y0 + block, ry.shape[0] ), x0, min( x0 + block, rx.shape[0] ) )
+
+
+@nb.njit(parallel=True, cache=True)
+def _subdivide_rows_parallel(mode, rx, ry, c, max, out, block):
+    """Fill out with the Mariani-Silver method, with the block by block squares shared out across numba's
+    threads.  The squares do not overlap, so the result is the same as _subdivide_rows()."""
+    rows = ( ry.shape[0] + block - 1 ) // block
+    cols = ( rx.shape[0] + block - 1 ) // block
+    for n in nb.prange( rows*cols ):
+        y0 = ( n // cols )*block
+        x0 = ( n % cols )*block
+        _subdivide_block( mode, rx, ry, c, max, out, y0, min( y0 + block, ry.shape[0] ), x0, min( x0 + block, rx.shape[0] ) )
+
+
+def _thread_count(workers):
+    """Translate a workers= option into a numba thread count.  None means every available thread, and the
+    request is capped at the number of threads numba was started with."""
+    if workers is None:
+        return nb.config.NUMBA_NUM_THREADS
+    return max( 1, min( int( workers ), nb.config.NUMBA_NUM_THREADS ) )
+
+
+#  the choices for JuliaPlane's precision option
+_PRECISIONS = ( None, 'float64', 'float32' )
+
+#  the choices for JuliaPlane's schedule option
+_SCHEDULES = ( 'static', 'dynamic', 'balanced' )
+
+#  the spacing, in points along each axis, of the coarse sample used to estimate the cost of each row
+_COST_STEP = 8
+
+#  the tag at the start of every file written by JuliaPlane.toBinary()
+_BINARY_TAG = b'JULIAPLN'
+
+#  how many rows of the plane the file writers handle at a time
+_CHUNK_ROWS = 256
+
+#  the number of points ComplexPlaneNP hands to f at a time, unless it is given chunkRows
+_CHUNK_POINTS = 2**20
+
+#  the number of colours to_image() spreads a plane of smooth values over
+_SMOOTH_LEVELS = 1024
+
+
+def colormap_table(cmap, maxLoop):
+    """Return the colour of every count from 0 to maxLoop as a (maxLoop+1, 3) array of 8-bit RGB values, so that an
+    image of a plane is just table[counts].  Counts are spread evenly over the colormap, 0 taking its first colour
+    and maxLoop its last.  cmap can be 'gray', which needs nothing else, the name of any matplotlib colormap, a
+    matplotlib Colormap, or an array of RGB (or RGBA) colours from 0 to 255 to use as the colormap.  matplotlib
+    itself is only imported when a colormap has to be looked up in it, and pyplot is never imported.
+    """
+    levels = np.arange( maxLoop + 1 )/float( max( 1, maxLoop ) )
+    if isinstance( cmap, str ) and cmap == 'gray':
+        return np.repeat( np.round( levels*255 ).astype( np.uint8 )[ :, np.newaxis ], 3, axis=1 )
+    if isinstance( cmap, str ):
+        import matplotlib
+        cmap = matplotlib.colormaps[ cmap ]
+    if callable( cmap ):
+        return np.round( np.asarray( cmap( levels ) )[ :, :3 ]*255 ).astype( np.uint8 )
+    colours = np.asarray( cmap )[ :, :3 ].astype( np.uint8 )
+    return colours[ np.round( levels*( len( colours ) - 1 ) ).astype( np.intp ) ]
+
+
+def write_png(pngfile, bands, width, height, level=1):
+    """Write an 8-bit RGB PNG image of width by height pixels to the binary file pngfile.  bands yields the image
+    from the top down as (rows, width, 3) uint8 arrays of any number of rows; each is compressed and written as it
+    arrives, so the whole image never has to be in memory.  level is the zlib compression level, from 0 (none)
+    to 9 (smallest); the default of 1 is the fastest that compresses, and since a rendered plane is mostly long
+    runs of a few colours the files it gives are seldom much larger than at the higher levels.
+    """
+    def chunk(kind, data):
+        pngfile.write( struct.pack( '>I', len( data ) ) + kind + data + struct.pack( '>I', zlib.crc32( kind + data ) & 0xffffffff ) )
+
+    pngfile.write( b'\x89PNG\r\n\x1a\n' )
+    chunk( b'IHDR', struct.pack( '>IIBBBBB', width, height, 8, 2, 0, 0, 0 ) )
+    packer = zlib.compressobj( level )
+    for band in bands:
+        #  every row of a PNG image starts with its filter type, 0 for none
+        raw = np.empty( ( band.shape[0], width*3 + 1 ), dtype=np.uint8 )
+        raw[ :, 0 ] = 0
+        raw[ :, 1: ] = band.reshape( band.shape[0], width*3 )
+        data = packer.compress( raw.tobytes() )
+        if data:
+            chunk( b'IDAT', data )
+    chunk( b'IDAT', packer.flush() )
+    chunk( b'IEND', b'' )
+
+
+def _julia_fill(rx, ry, c, max, out, workers=1, cycles=False):
+    """Fill out with the escape-time counts of the points rx[j] + ry[i]*1j, on a single core when workers is 1
+    and across numba's threads otherwise, with periodicity checking if cycles is True (see JuliaPlane for the
+    meaning of workers and cycles).  Without numba the numpy engine is used instead."""
+    if not _NUMBA:
+        _numpy_fill( rx, ry, c, max, out )
+        return
+    _run_kernel( _julia_rows, _julia_rows_parallel, workers, _escape( cycles ), rx, ry, complex( c ), max, out )
+
+
+def _numpy_fill(rx, ry, c, maxLoop, out, precision=None):
+    """Fill out with the escape-time counts of the points rx[j] + ry[i]*1j using numpy alone, a block of rows
+    at a time, in single precision when precision is 'float32' and double precision otherwise.  The counts
+    are exactly those of the kernels in the same precision."""
+    dtype = np.float32 if precision == 'float32' else np.float64
+    rows = max( 1, _CHUNK_POINTS//max( 1, len( rx ) ) )
+    for start in range( 0, len( ry ), rows ):
+        block = ry[ start:start + rows ]
+        x = np.tile( rx.astype( dtype ), len( block ) )
+        y = np.repeat( block.astype( dtype ), len( rx ) )
+        out[ start:start + rows ] = _numpy_counts( x, y, complex( c ), maxLoop, precision != 'float32' ).reshape( len( block ), len( rx ) )
+
+
+def _numpy_counts(x, y, c, maxLoop, exact=True):
+    """Return the escape-time counts of the points x + y*1j, given as two flat arrays, which are left as they
+    are.  Each step advances every point that has not escaped by one loop, z = z**2 + c, with the same
+    operations in the same order as _split_point(), and then packs the points that have escaped out of the
+    arrays, so the work done follows the number of points still iterating.  exact is as for _inside()."""
+    counts = np.ones( x.shape, dtype=np.int32 )
+    xx = x*x
+    yy = y*y
+    #  points already too big keep the count of 1, the others start at 0, which is also the count at maxLoop
+    index = np.flatnonzero( _numpy_inside( x, y, xx + yy, exact ) )
+    counts[ index ] = 0
+    x, y, xx, yy = x[ index ], y[ index ], xx[ index ], yy[ index ]
+    cr = x.dtype.type( c.real )
+    ci = x.dtype.type( c.imag )
+    m = np.empty_like( x )
+    for n in range( maxLoop ):
+        if not len( index ):
+            break
+        #  perform the operation z = z**2 + c on the two parts, in place
+        y *= x
+        y *= 2
+        y += ci
+        np.subtract( xx, yy, out=x )
+        x += cr
+        np.multiply( x, x, out=xx )
+        np.multiply( y, y, out=yy )
+        np.add( xx, yy, out=m )
+        escaped = ~_numpy_inside( x, y, m, exact )
+        if escaped.any():
+            #  count the loops *before* exceeding 2, and drop those points
+            counts[ index[ escaped ] ] = n
+            keep = ~escaped
+            x, y, xx, yy, m, index = x[ keep ], y[ keep ], xx[ keep ], yy[ keep ], m[ keep ], index[ keep ]
+    return counts
+
+
+def _numpy_inside(x, y, m, exact):
+    """Return an array of True where the point x + y*1j, with |z|**2 = m, has not escaped, settling the values of
+    m too close to 4 to call with np.hypot() when exact is set, as _inside() does."""
+    inside = m <= 4
+    if exact:
+        unsure = np.flatnonzero( ( m >= 3.9999999 ) & ( m <= 4.0000001 ) )
+        if len( unsure ):
+            inside[ unsure ] = np.hypot( x[ unsure ], y[ unsure ] ) <= 2.0
+    return inside
+
+
+def _direct_fill(rx, ry, c, max, out, workers=1, cycles=False, precision=None, engine='numba'):
+    """Fill out with the 'direct' escape-time counts of the points rx[j] + ry[i]*1j, computed by the engine and
+    in the precision given (see JuliaPlane)."""
+    if engine == 'numpy':
+        _numpy_fill( rx, ry, c, max, out, precision )
+    elif precision is None:
+        _julia_fill( rx, ry, c, max, out, workers, cycles )
+    else:
+        _split_fill( rx, ry, c, max, out, workers, precision )
+
+
+#  what each worker process of JuliaPlane.renderShared() works on:  the shared block, the plane over it, and
+#  the options of the plane being computed
+_SHARED = None
+
+
+def _attach_shared(name, shape, options):
+    """Attach a renderShared() worker process to the shared block called name, for the rest of its life, and
+    compute a single point with the plane's options, so that the kernel is loaded before the first band."""
+    global _SHARED
+    block = shared_memory.SharedMemory( name=name )
+    _SHARED = ( block, np.ndarray( shape, dtype=np.int32, buffer=block.buf ), options )
+    xmin, xmax, xlen, ymin, ymax, ylen, c, max, cycles, precision, engine = options
+    _direct_fill( np.zeros( 1 ), np.zeros( 1 ), c, max, np.empty( ( 1, 1 ), dtype=np.int32 ), 1, cycles, precision, engine )
+
+
+def _render_band(rows):
+    """Compute the band of rows (start, stop) in a renderShared() worker, writing the counts straight into the
+    shared plane, and return the band."""
+    block, plane, options = _SHARED
+    xmin, xmax, xlen, ymin, ymax, ylen, c, max, cycles, precision, engine = options
+    #  the full axes are made just as refresh() makes them, so the band's points are exactly the plane's
+    rx = np.linspace( xmin, xmax, xlen )
+    ry = np.linspace( ymin, ymax, ylen )
+    _direct_fill( rx, ry[ rows[0]:rows[1] ], c, max, plane[ rows[0]:rows[1] ], 1, cycles, precision, engine )
+    return rows
+
+
+def _close_shared(block):
+    """Release the parent's mapping of a renderShared() block once the plane over it has gone.  A view of the
+    plane that outlives it keeps the memory in use, in which case the mapping is left until the process ends."""
+    try:
+        block.close()
+    except BufferError:
+        pass
+
+
+def _timed(stats, name):
+    """Return stats.phase(name), or a context that does nothing when stats is None."""
+    if stats is None:
+        return contextlib.nullcontext()
+    return stats.phase( name )
+
+
+def _compiled_count():
+    """Return how many compiled versions the kernels in this module have between them.  The number goes up
+    whenever a call has to compile a kernel for new argument types, or load it from numba's cache."""
+    return sum( len( kernel.signatures ) for kernel in list( globals().values() ) if hasattr( kernel, 'signatures' ) )
+
+
+def _escape(cycles, precision=None):
+    """Return the mode of the per-point calculation to use, with or without periodicity checking, in the given
+    precision (see JuliaPlane and _escape_point())."""
+    if precision == 'float64':
+        return _SPLIT64
+    if precision == 'float32':
+        return _SPLIT32
+    return _CYCLES if cycles else _DIRECT
+
+
+def _split_fill(rx, ry, c, max, out, workers=1, precision='float64'):
+    """Fill out with the escape-time counts of the points rx[j] + ry[i]*1j using the split real/imaginary
+    kernels, in double precision (exactly the same counts as _julia_fill) or in single precision."""
+    dtype = np.float64 if precision == 'float64' else np.float32
+    c = complex( c )
+    _run_kernel( _split_rows, _split_rows_parallel, workers, rx.astype( dtype ), ry.astype( dtype ),
+                 dtype( c.real ), dtype( c.imag ), dtype( 2 ), dtype( 4 ), precision == 'float64', max, out )
+
+
+def _run_kernel(serial, parallel, workers, *args, chunksize=0):
+    """Call the compiled kernel serial(*args) when workers is 1, and otherwise parallel(*args) with numba's
+    thread count set from workers for the length of the call.  Without numba there are no threads, and serial
+    is always used.  A chunksize other than 0 has the parallel loop handed out chunksize iterations at a time
+    to whichever thread is free, instead of in equal blocks fixed at the start."""
+    if workers == 1 or not _NUMBA:
+        serial( *args )
+        return
+    previous = nb.get_num_threads()
+    previousChunk = nb.get_parallel_chunksize()
+    nb.set_num_threads( _thread_count( workers ) )
+    nb.set_parallel_chunksize( chunksize )
+    try:
+        parallel( *args )
+    finally:
+        nb.set_parallel_chunksize( previousChunk )
+        nb.set_num_threads( previous )
+
+
+def _scheduled_fill(rx, ry, c, max, out, workers, cycles, schedule):
+    """Fill out with the escape-time counts of the points rx[j] + ry[i]*1j across numba's threads, handing the
+    rows out one at a time, in order for 'dynamic' and most expensive first for 'balanced' (see JuliaPlane)."""
+    order = _row_order( rx, ry, c, max, cycles, workers ) if schedule == 'balanced' else np.arange( len( ry ) )
+    _run_kernel( _julia_rows_ordered, _julia_rows_ordered, workers, _escape( cycles ), rx, ry, complex( c ), max, out, order, chunksize=1 )
+
+
+def _row_order(rx, ry, c, max, cycles=False, workers=1):
+    """Return the rows of the plane with the axes rx and ry in order of their estimated cost, most expensive
+    first.  The estimate comes from the counts of a sample of every _COST_STEP-th point along each axis, with
+    a point that escapes costing its count + 1 loops and one that does not costing max; each row is given the
+    cost of the nearest sampled row at or above it.  The sample costs about 1/_COST_STEP**2 of the plane, and
+    is shared out across the same workers as the plane itself, its rows one at a time to whichever is free."""
+    sample = np.empty( ( len( ry[ ::_COST_STEP ] ), len( rx[ ::_COST_STEP ] ) ), dtype=np.int32 )
+    _run_kernel( _julia_rows, _julia_rows_parallel, workers, _escape( cycles ), rx[ ::_COST_STEP ].copy(), ry[ ::_COST_STEP ].copy(), complex( c ), max, sample, chunksize=1 )
+    cost = np.where( sample == 0, max, sample.astype( np.int64 ) + 1 ).sum( axis=1 )
+    #  a stable sort keeps rows of equal cost in order, next to each other
+    return np.argsort( -np.repeat( cost, _COST_STEP )[ :len( ry ) ], kind='stable' )
+
+
+def _open_tiled(filename, mode='r+'):
+    """Return the parameters and the finished-tile flags saved alongside a tiled render, or (None, None) if
+    the render has not been started.  mode is the numpy.memmap mode used to open the flags."""
+    import json
+    if not os.path.exists( filename + '.json' ):
+        return None, None
+    with open( filename + '.json' ) as jsonfile:
+        params = json.load( jsonfile )
+    if not os.path.exists( filename + '.done' ):
+        return params, None
+    done = np.memmap( filename + '.done', dtype=np.uint8, mode=mode )
+    return params, done
+
+
+def render_tiled(filename, newXmin=-5., newXmax=5., newXlen=11, newYmin=-5., newYmax=5., newYlen=11, c=(-1.037 + 0.17j), maxLoop=100, tileSize=1024, workers=1, cycles=False):
+    """Render a julia plane that is too big to hold in memory into the .npy file filename, one tile at a time.
+    The parameters are the same as for JuliaPlane, plus tileSize, the number of points along each side of a
+    tile, and workers and cycles, which work as they do for JuliaPlane.  The file is opened as a memory-mapped
+    array, so only the tile being worked on is held in memory.
+
+    Two small files are kept next to the plane:  filename.json holds the parameters, and filename.done holds
+    one flag per tile that is only set once the tile has been flushed to disk.  If the render is interrupted,
+    calling render_tiled() again with the same parameters skips the tiles that are already done.  Calling it
+    with different parameters for an existing file raises a ValueError.
+
+    The counts are identical to the ones JuliaPlane.refresh() would compute.  The finished plane is returned
+    as a read-only memory-mapped array, and JuliaPlane.fromTiled() can attach a plane to the file.
+    """
+    import json
+    params = { "xmin":newXmin, "xmax":newXmax, "xlen":int( newXlen ), "ymin":newYmin, "ymax":newYmax, "ylen":int( newYlen ),
+               "creal":complex( c ).real, "cimaginary":complex( c ).imag, "max":int( maxLoop ), "tileSize":int( tileSize ) }
+    rows = -( -params[ 'ylen' ] // params[ 'tileSize' ] )
+    cols = -( -params[ 'xlen' ] // params[ 'tileSize' ] )
+
+    saved, done = _open_tiled( filename )
+    if saved is not None and saved != params:
+        raise ValueError( '%s was started with different parameters: %s' % ( filename, saved ) )
+    if done is None or not os.path.exists( filename ):
+        #  a fresh start:  write the parameters first, then the plane and the (all clear) tile flags
+        with open( filename + '.json', 'w' ) as jsonfile:
+            json.dump( params, jsonfile )
+        plane = np.lib.format.open_memmap( filename, mode='w+', dtype=np.int32, shape=( params[ 'ylen' ], params[ 'xlen' ] ) )
+        done = np.memmap( filename + '.done', dtype=np.uint8, mode='w+', shape=( rows*cols, ) )
+    else:
+        plane = np.load( filename, mmap_mode='r+' )
+
+    rx = np.linspace( newXmin, newXmax, params[ 'xlen' ] )
+    ry = np.linspace( newYmin, newYmax, params[ 'ylen' ] )
+    tile = params[ 'tileSize' ]
+    for row in range( rows ):
+        for col in range( cols ):
+            if done[ row*cols + col ]:
+                continue
+            y0, x0 = row*tile, col*tile
+            block = np.empty( ( len( ry[ y0:y0+tile ] ), len( rx[ x0:x0+tile ] ) ), dtype=np.int32 )
+            _julia_fill( rx[ x0:x0+tile ], ry[ y0:y0+tile ], c, maxLoop, block, workers, cycles )
+            plane[ y0:y0+tile, x0:x0+tile ] = block
+            #  the tile only counts as done once its counts are safely on disk
+            plane.flush()
+            done[ row*cols + col ] = 1
+            done.flush()
+
+    del plane, done
+    return np.load( filename, mmap_mode='r' )
+
+
 def julia(c, max=100):
     """This method creates and returns a function, f.  The parameters passed to julia are:
     c - an imagery valued constant that is used in the function f.
     max - an optional argument that sets the maximum loop count within f.  Default is 100.
 
     The function f requires a single parameter:
-    z - an imaginary number
+    z - an imaginary number, or a numpy array of imaginary numbers
 
     f then performs the operation z = z**2 + c on the z passed to f along with the c value passed to julia.
     The operation is performed up to max times.
@@ -299,27 +2020,18 @@ def julia(c, max=100):
 
     Note that f's return value of 1 is ambiguous:  it could be because the initial z was too large,
     or because the operation could be performed once successfully.
+
+    The work is done by the compiled kernel _julia_kernel, so creating a new f for a new value of c
+    does not trigger another JIT compilation.  Without numba the numpy engine is used instead.
     """
-    #  this decorator causes this function definition to be JIT
-    @nb.vectorize([nb.int32(nb.complex128)])
+    c = complex( c )
+    max = int( max )
+
     def f(z):
-        # check to see if the input is already too big
-        if abs( z ) <= 2:
-            n = 0
-            while abs(z)<=2:
-                #  perform the operation
-                z = z**2 + c
-                #  have we exceeded our max loop count-1?
-                if n >= max:
-                    n = 1
-                    break
-                #  count the number of times through the loop
-                n+=1
-            n -= 1  # subtract one to count the total loops *before* exceeding 2, also reports 0 if max loop reached
-        else:
-            #  report input too big
-            n = 1
-        return n
+        if not _NUMBA:
+            z = np.asarray( z, dtype=np.complex128 )
+            return _numpy_counts( z.real.ravel(), z.imag.ravel(), c, max ).reshape( z.shape )[()]
+        return _julia_kernel( z, c, max )
 
     #  return the function pointer to the caller of the julia() method
     return f
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+
+"""Julia tile server.
+
+This module serves tiles of julia planes over HTTP on the local machine, for a map
+style viewer in a browser.  Run it with
+    python julia_server.py --port 8510 --workers 4
+and ask for tiles at
+    http://127.0.0.1:8510/tiles/{z}/{x}/{y}.png?cr=-0.8&ci=0.156&max=200
+
+z is the zoom level and x, y the column and row of the tile, counted from the top left,
+in the usual web map layout:  at zoom 0 one tile covers the square -2 <= x, y <= 2, and
+each zoom level halves the width of a tile.  cr and ci are the real and imaginary parts
+of the constant c, max is the maximum loop count, size (default 256) the number of
+points along each side of the tile, and cmap (default gray) the matplotlib colormap
+the PNG tiles are coloured with.  Ending the path in .raw instead of .png returns the
+escape-time counts themselves, as little-endian int32 values, row by row from the top.
+/stats returns the server's counters as JSON.
+
+The server runs on asyncio.  The escape-time computation is handed to a pool of worker
+processes, so the event loop keeps answering while tiles are computed.  Finished tiles
+are kept in a cplane_np.TileCache, and requests for a tile that is already being
+computed wait for that computation rather than starting another.  The server only
+listens on the loopback interface.
+"""
+
+import argparse
+import asyncio
+import concurrent.futures
+import io
+import json
+import multiprocessing
+import urllib.parse
+
+import numpy as np
+
+import cplane_np as jp
+
+
+#  the square covered by the single tile at zoom level 0
+WORLD = ( -2., 2., -2., 2. )
+
+#  the largest values the request parameters may take
+MAX_ZOOM = 40
+MAX_SIZE = 1024
+MAX_LOOP = 100000
+
+#  the only addresses the server will listen on
+LOCAL_HOSTS = ( '127.0.0.1', 'localhost', '::1' )
+
+_REASONS = { 200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error' }
+
+
+def tile_window(z, x, y):
+    """Return the window (xmin, xmax, ymin, ymax) covered by tile x, y at zoom level z."""
+    width = ( WORLD[1] - WORLD[0] )/2**z
+    height = ( WORLD[3] - WORLD[2] )/2**z
+    xmin = WORLD[0] + x*width
+    ymax = WORLD[3] - y*height
+    return xmin, xmin + width, ymax - height, ymax
+
+
+def render_tile(cr, ci, maxLoop, z, x, y, size=256):
+    """Compute the escape-time counts of tile x, y at zoom level z, as a size by size int32 array with the top
+    row first.  Each count is taken at the centre of its pixel, so neighbouring tiles do not repeat their shared
+    edge.  This runs in the worker processes."""
+    xmin, xmax, ymin, ymax = tile_window( z, x, y )
+    halfX = ( xmax - xmin )/size/2
+    halfY = ( ymax - ymin )/size/2
+    plane = jp.JuliaPlane( xmin + halfX, xmax - halfX, size, ymin + halfY, ymax - halfY, size, complex( cr, ci ), maxLoop )
+    #  the plane's first row is at ymin, but an image starts at the top
+    return np.ascontiguousarray( plane.plane[ ::-1 ] )
+
+
+def png_tile(counts, table):
+    """Encode the counts as an RGB PNG, colouring each count with its row of the colormap table (see
+    cplane_np.colormap_table()), and return its bytes."""
+    image = io.BytesIO()
+    jp.write_png( image, [ table[ np.clip( counts, 0, len( table ) - 1 ) ] ], counts.shape[1], counts.shape[0] )
+    return image.getvalue()
+
+
+class RequestError(Exception):
+    """Raised for a request the server cannot answer, carrying the HTTP status to reply with."""
+
+    def __init__(self, status, message):
+        Exception.__init__( self, message )
+        self.status = status
+
+
+class TileServer(object):
+    """This is the Class TileServer.  It answers HTTP requests for julia tiles (see the module documentation for
+    the URLs), computing the tiles in an executor and keeping the finished ones in a TileCache.
+
+    The counters rendered, coalesced, and the cache's hits and misses are reported at /stats.  coalesced counts
+    the requests that were answered by joining a computation already in progress for the same tile.
+    """
+
+    def __init__(self, executor=None, workers=None, cacheBytes=64*2**20):
+        """Create a server.  The tiles are computed in executor if one is given, and otherwise in a new pool of
+        workers processes (by default one per core).  Up to cacheBytes of finished tiles are kept in memory."""
+        #  the workers are started fresh rather than forked, so they do not hold on to copies of open connections,
+        #  which would keep them open after the server or the client has closed them
+        self.executor = executor if executor is not None else concurrent.futures.ProcessPoolExecutor( workers, multiprocessing.get_context( 'spawn' ) )
+        self.cache = jp.TileCache( maxBytes=cacheBytes )
+        self.pending = {}
+        self.connections = set()
+        self.tables = {}
+        self.rendered = 0
+        self.coalesced = 0
+
+    async def tile(self, cr, ci, maxLoop, z, x, y, size):
+        """Return the counts for a tile, from the cache, from a computation already under way, or by handing a
+        new computation to the executor."""
+        key = ( cr, ci, maxLoop, z, x, y, size )
+        counts = self.cache.get( key )
+        if counts is not None:
+            return counts
+        if key in self.pending:
+            self.coalesced += 1
+            #  shield the shared computation, so a client that goes away does not cancel it for the others
+            return await asyncio.shield( self.pending[ key ] )
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor( self.executor, render_tile, cr, ci, maxLoop, z, x, y, size )
+        self.pending[ key ] = future
+        try:
+            counts = await asyncio.shield( future )
+        finally:
+            if future.done():
+                del self.pending[ key ]
+            else:
+                future.add_done_callback( lambda done: self.pending.pop( key, None ) )
+        self.rendered += 1
+        self.cache.put( key, counts )
+        return counts
+
+    def table(self, cmap, maxLoop):
+        """Return the colormap table for cmap and maxLoop, building it the first time it is asked for."""
+        key = ( cmap, maxLoop )
+        if key not in self.tables:
+            try:
+                self.tables[ key ] = jp.colormap_table( cmap, maxLoop )
+            except KeyError:
+                raise RequestError( 400, 'unknown colormap: %s' % cmap )
+        return self.tables[ key ]
+
+    def stats(self):
+        """Return the server's counters as a dictionary."""
+        return { "rendered":self.rendered, "coalesced":self.coalesced, "in_flight":len( self.pending ),
+                 "cache_hits":self.cache.hits, "cache_misses":self.cache.misses, "cache_bytes":self.cache.bytes }
+
+    async def respond(self, target):
+        """Work out the answer to a GET request for target, returning (content type, body)."""
+        url = urllib.parse.urlsplit( target )
+        if url.path == '/stats':
+            return 'application/json', json.dumps( self.stats() ).encode( 'ascii' )
+
+        parts = url.path.strip( '/' ).split( '/' )
+        if len( parts ) != 4 or parts[0] != 'tiles' or '.' not in parts[3]:
+            raise RequestError( 404, 'no such path: %s' % url.path )
+        name, kind = parts[3].rsplit( '.', 1 )
+        query = urllib.parse.parse_qs( url.query )
+        try:
+            z = int( parts[1] )
+            x = int( parts[2] )
+            y = int( name )
+            cr = float( query.get( 'cr', [ '-0.8' ] )[0] )
+            ci = float( query.get( 'ci', [ '0.156' ] )[0] )
+            maxLoop = int( query.get( 'max', [ '100' ] )[0] )
+            size = int( query.get( 'size', [ '256' ] )[0] )
+            cmap = query.get( 'cmap', [ 'gray' ] )[0]
+        except ValueError as error:
+            raise RequestError( 400, 'bad tile request: %s' % error )
+        if kind not in ( 'png', 'raw' ):
+            raise RequestError( 404, 'tiles are available as .png or .raw, not .%s' % kind )
+        if not ( 0 <= z <= MAX_ZOOM and 0 <= x < 2**z and 0 <= y < 2**z ):
+            raise RequestError( 400, 'tile %d/%d/%d does not exist' % ( z, x, y ) )
+        #  a plane needs at least two points along each side to have a grid step
+        if not ( 2 <= size <= MAX_SIZE and 1 <= maxLoop <= MAX_LOOP ):
+            raise RequestError( 400, 'size must be 2..%d and max 1..%d' % ( MAX_SIZE, MAX_LOOP ) )
+
+        #  building a table can import matplotlib, and colouring and compressing a large tile takes a while, so
+        #  both are done in a thread rather than on the event loop, which keeps answering meanwhile
+        loop = asyncio.get_running_loop()
+        table = await loop.run_in_executor( None, self.table, cmap, maxLoop ) if kind == 'png' else None
+        counts = await self.tile( cr, ci, maxLoop, z, x, y, size )
+        if kind == 'raw':
+            return 'application/octet-stream', counts.astype( '<i4' ).tobytes()
+        return 'image/png', await loop.run_in_executor( None, png_tile, counts, table )
+
+    async def handle(self, reader, writer):
+        """Serve the HTTP/1.1 requests that arrive on one connection, until the client closes it or asks to.
+        The task serving the connection is kept in self.connections until it is done."""
+        task = asyncio.current_task()
+        self.connections.add( task )
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in ( b'\r\n', b'\n', b'' ):
+                        break
+                    name, _, value = header.decode( 'latin-1' ).partition( ':' )
+                    headers[ name.strip().lower() ] = value.strip()
+                keepAlive = headers.get( 'connection', '' ).lower() != 'close'
+
+                try:
+                    method, target, version = line.decode( 'latin-1' ).split()
+                    if method != 'GET':
+                        raise RequestError( 405, 'only GET is supported' )
+                    status = 200
+                    contentType, body = await self.respond( target )
+                except RequestError as error:
+                    status, contentType, body = error.status, 'text/plain', ( str( error ) + '\n' ).encode( 'utf-8' )
+                except ValueError:
+                    status, contentType, body = 400, 'text/plain', b'malformed request line\n'
+                except Exception as error:
+                    #  a failed render, or a colormap that needs a missing matplotlib:  answer rather than drop the connection
+                    status, contentType, body = 500, 'text/plain', ( 'could not answer the request: %r\n' % ( error, ) ).encode( 'utf-8' )
+
+                writer.write( ( 'HTTP/1.1 %d %s\r\nContent-Type: %s\r\nContent-Length: %d\r\nConnection: %s\r\n\r\n'
+                                % ( status, _REASONS[ status ], contentType, len( body ), 'keep-alive' if keepAlive else 'close' ) ).encode( 'latin-1' ) + body )
+                await writer.drain()
+                if not keepAlive:
+                    break
+        except ( ConnectionError, asyncio.IncompleteReadError ):
+            #  the client went away, so the connection is finished
+            pass
+        finally:
+            #  this also runs when the server is shutting down and the task is cancelled, which carries on out of here
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            finally:
+                self.connections.discard( task )
+
+    def close(self):
+        """Shut down the executor the tiles are computed in, waiting for the computations under way to finish."""
+        self.executor.shutdown()
+
+    async def start(self, host='127.0.0.1', port=8510):
+        """Start listening on host and port, and return the asyncio server.  Only loopback addresses are accepted."""
+        if host not in LOCAL_HOSTS:
+            raise ValueError( 'the tile server only listens on the local machine, not on %s' % host )
+        return await asyncio.start_server( self.handle, host, port )
+
+
+async def serve(host, port, workers):
+    """Run a TileServer until interrupted."""
+    tiles = TileServer( workers=workers )
+    try:
+        server = await tiles.start( host, port )
+        print( 'serving julia tiles on %s' % ', '.join( 'http://%s:%d' % sock.getsockname()[ :2 ] for sock in server.sockets ) )
+        async with server:
+            await server.serve_forever()
+    finally:
+        tiles.close()
+
+
+def main():
+    parser = argparse.ArgumentParser( description=__doc__.splitlines()[0] )
+    parser.add_argument( '--host', default='127.0.0.1', choices=LOCAL_HOSTS, help='loopback address to listen on' )
+    parser.add_argument( '--port', type=int, default=8510, help='port to listen on' )
+    parser.add_argument( '--workers', type=int, default=None, help='worker processes (default: one per core)' )
+    args = parser.parse_args()
+    try:
+        asyncio.run( serve( args.host, args.port, args.workers ) )
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import os
+import json
 import numpy as np
 import pandas as pd
 import cplane_np as jp
@@ -244,3 +246,567 @@ def itest_refresh1():
     message = 'refresh() did not correctly retore the plane to the expected coordinate values'
     assert success, message
 
+
+def test_julia_array():
+    """Test that the julia function gives the same counts for a whole array as it does point by point"""
+    f = jp.julia( -0.8 + 0.156j, 50 )
+    z = np.linspace( -1.5, 1.5, 7 ) + np.linspace( -1.0, 1.0, 7 )*1j
+
+    expected = [ f( point ) for point in z ]
+    actual = f( z ).tolist()
+
+    message = 'Julia function gave different counts for an array:  actual %s expected %s' % (actual, expected)
+    assert actual == expected, message
+
+def test_refresh_parallel():
+    """Test that refreshing the plane on several cores gives exactly the same counts as a single core"""
+    serial = jp.JuliaPlane( -2, 2, 101, -2, 2, 101, -0.8 + 0.156j, workers=1 )
+    parallel = jp.JuliaPlane( -2, 2, 101, -2, 2, 101, -0.8 + 0.156j, workers=None )
+
+    success = np.array_equal( np.asarray( serial.plane ), np.asarray( parallel.plane ) )
+    message = 'Parallel refresh did not reproduce the single core plane'
+    assert success, message
+
+def test_refresh_matches_julia():
+    """Test that the plane holds the same counts as applying the julia function to every coordinate point"""
+    c = -0.8 + 0.156j
+    tp = jp.JuliaPlane( -2, 2, 41, -1.5, 1.5, 31, c, 60 )
+
+    x, y = np.meshgrid( np.linspace( -2, 2, 41 ), np.linspace( -1.5, 1.5, 31 ) )
+    expected = jp.julia( c, 60 )( x + y*1j )
+
+    success = np.array_equal( np.asarray( tp.plane ), expected )
+    message = 'refresh() did not store the julia counts for each coordinate point'
+    assert success, message
+
+def test_frame():
+    """Test that the plane is a numpy array and that the DataFrame view holds the same numbers with coordinate labels"""
+    tp = jp.JuliaPlane( -2, 2, 5, -1, 1, 3 )
+    frame = tp.frame
+
+    success = isinstance( tp.plane, np.ndarray ) and isinstance( frame, pd.DataFrame )
+    success = success and np.array_equal( frame.values, tp.plane )
+    success = success and list( frame.index ) == [ '-1.0', '0.0', '1.0' ] and list( frame.columns )[0] == '-2.0'
+    #  the rows are labelled with their y coordinate, bottom up for the vectorized plane and top down for JuliaPlaneNV
+    success = success and list( jp.JuliaPlaneNV( -2, 2, 5, -1, 1, 3 ).frame.index ) == [ '1.0', '0.0', '-1.0' ]
+    message = 'frame did not give a labelled DataFrame of the plane'
+    assert success, message
+
+def test_render_tiled( tmp_path ):
+    """Test that a tiled render matches refresh(), skips finished tiles when resumed, and can be attached to a plane"""
+    filename = str( tmp_path / 'plane.npy' )
+    c = -0.8 + 0.156j
+    expected = jp.JuliaPlane( -2, 2, 50, -1.5, 1.5, 40, c, 60 ).plane
+
+    plane = jp.render_tiled( filename, -2, 2, 50, -1.5, 1.5, 40, c, 60, tileSize=16 )
+    success = np.array_equal( plane, expected )
+
+    #  pretend the render crashed after the first tile:  clear every other tile's flag and corrupt the first tile
+    del plane
+    done = np.memmap( filename + '.done', dtype=np.uint8, mode='r+' )
+    done[ 1: ] = 0
+    done.flush()
+    del done
+    corrupt = np.load( filename, mmap_mode='r+' )
+    corrupt[ :16, :16 ] = -1
+    corrupt[ 16:, : ] = -1
+    corrupt.flush()
+    del corrupt
+
+    plane = jp.render_tiled( filename, -2, 2, 50, -1.5, 1.5, 40, c, 60, tileSize=16 )
+    success = success and ( plane[ :16, :16 ] == -1 ).all() and np.array_equal( plane[ 16:, : ], expected[ 16:, : ] )
+
+    tp = jp.JuliaPlane( output='smooth' )
+    tp.fromTiled( filename )
+    success = success and isinstance( tp.plane, np.memmap ) and tp.xlen == 50 and tp.ylen == 40 and tp.c == c and tp.output == 'counts'
+
+    #  JuliaPlaneNV keeps ymax in row 0, and its labels must still match its rows
+    nvname = str( tmp_path / 'nv.npy' )
+    jp.render_tiled( nvname, -2, 2, 50, -0.5, 1.5, 40, c, 60, tileSize=16 )
+    nv = jp.JuliaPlaneNV()
+    nv.fromTiled( nvname )
+    success = success and np.array_equal( nv.plane, jp.JuliaPlaneNV( -2, 2, 50, -0.5, 1.5, 40, c, 60 ).plane ) and nv.frame.index[0] == '1.5'
+
+    message = 'render_tiled() did not render, resume or attach the tiled plane correctly'
+    assert success, message
+
+def test_binary( tmp_path ):
+    """Test that a plane saved with toBinary() is read back by fromBinary() with the same parameters and contents,
+    with and without compression"""
+    tp = jp.JuliaPlane( -2, 2, 30, -1.5, 1.5, 20, -0.8 + 0.156j, 60 )
+    success = True
+
+    for compress in ( False, True ):
+        filename = str( tmp_path / ( 'plane%d.jpl' % compress ) )
+        tp.toBinary( filename, compress )
+
+        rp = jp.JuliaPlane( output='both', modulus=True )
+        rp.fromBinary( filename )
+        success = success and np.array_equal( rp.plane, tp.plane ) and rp.plane.dtype == np.int32
+        success = success and rp.smooth is None and rp.modulus is None
+        success = success and ( rp.xmin, rp.xmax, rp.xlen, rp.ymin, rp.ymax, rp.ylen, rp.c, rp.max ) == ( -2, 2, 30, -1.5, 1.5, 20, -0.8 + 0.156j, 60 )
+        success = success and isinstance( rp.plane, np.memmap ) != compress
+
+    #  the rows are turned over between JuliaPlane and JuliaPlaneNV, whose row 0 is ymax, and smooth planes stay smooth
+    nv = jp.JuliaPlaneNV( -2, 2, 30, -0.5, 1.5, 20, -0.8 + 0.156j, 60 )
+    vectorized = jp.JuliaPlane( -2, 2, 30, -0.5, 1.5, 20, -0.8 + 0.156j, 60 )
+    for source, target, expected in ( ( nv, jp.JuliaPlane(), vectorized.plane ), ( vectorized, jp.JuliaPlaneNV(), nv.plane ) ):
+        filename = str( tmp_path / 'turned.jpl' )
+        source.toBinary( filename )
+        target.fromBinary( filename )
+        success = success and np.array_equal( target.plane, expected ) and target.output == 'counts'
+    smooth = jp.JuliaPlane( -2, 2, 30, -0.5, 1.5, 20, -0.8 + 0.156j, 60, output='smooth' )
+    smooth.toBinary( filename )
+    rp = jp.JuliaPlane()
+    rp.fromBinary( filename )
+    success = success and np.array_equal( rp.plane, smooth.plane ) and rp.output == 'smooth'
+
+    message = 'fromBinary() did not restore the plane written by toBinary()'
+    assert success, message
+
+def test_text_io( tmp_path ):
+    """Test that the CSV and JSON files hold the plane's contents and can be read back by fromCSV() and fromJSON()"""
+    import json
+    tp = jp.JuliaPlane( -2, 2, 30, -1.5, 1.5, 20, -0.8 + 0.156j )
+    csvname = str( tmp_path / 'plane.csv' )
+    jsonname = str( tmp_path / 'plane.json' )
+    tp.toCSV( csvname )
+    tp.toJSON( jsonname )
+
+    success = np.array_equal( np.loadtxt( csvname, delimiter=',', skiprows=3 ), tp.plane )
+    with open( jsonname ) as jsonfile:
+        data = json.load( jsonfile )
+    rows = [ list( data[ 'JuliaPlaneContents%d' % row ].values() )[0] for row in range( tp.ylen ) ]
+    success = success and np.array_equal( rows, tp.plane ) and list( data[ 'JuliaPlaneContents0' ] ) == [ '-1.5' ]
+
+    for name, reader in ( ( csvname, 'fromCSV' ), ( jsonname, 'fromJSON' ) ):
+        rp = jp.JuliaPlane()
+        getattr( rp, reader )( name )
+        success = success and np.array_equal( rp.plane, tp.plane ) and rp.c == tp.c
+
+    message = 'the CSV and JSON files did not round trip the plane'
+    assert success, message
+
+def test_pan():
+    """Test that panning gives the same plane as creating one at the new window, and that it reuses the points still in view"""
+    c = -0.8 + 0.156j
+    tp = jp.JuliaPlane( -2.5, 2.5, 41, -2, 2, 33, c, 60 )
+    #  mark a point that stays in view, so we can tell it was moved across rather than recomputed
+    tp.plane[ 10, 10 ] = -1
+    tp.pan( 3, -2 )
+    expected = jp.JuliaPlane( -2.125, 2.875, 41, -2.25, 1.75, 33, c, 60 ).plane
+
+    success = tp.plane[ 12, 7 ] == -1
+    tp.plane[ 12, 7 ] = expected[ 12, 7 ]
+    success = success and np.array_equal( tp.plane, expected ) and ( tp.xmin, tp.xmax, tp.ymin, tp.ymax ) == ( -2.125, 2.875, -2.25, 1.75 )
+
+    #  a zoom that lines up with the grid should be handled the same way
+    tp.zoom( -2.5, 2.5, -2, 2 )
+    expected = jp.JuliaPlane( -2.5, 2.5, 41, -2, 2, 33, c, 60 ).plane
+    success = success and np.array_equal( tp.plane, expected )
+
+    #  a step between grid points cannot reuse the plane, and is refused rather than truncated
+    try:
+        tp.pan( 0.5, 0 )
+        success = False
+    except ValueError:
+        success = success and ( tp.xmin, tp.ymin ) == ( -2.5, -2 )
+
+    message = 'pan() did not produce the plane for the new window'
+    assert success, message
+
+def test_nv_methods():
+    """Test that JuliaPlaneNV has JuliaPlane's defaults, and that the compiled renderers it inherits give or refuse planes
+    with its rows, ymax first"""
+    nv = jp.JuliaPlaneNV( -2, 2, 9, -1, 1.5, 7 )
+    success = ( nv.stats, nv.output, nv.cache, nv.adaptive, nv.schedule, nv.smooth, nv.modulus ) == ( None, 'counts', None, None, 'static', None, None )
+    frames = nv.batch( [ 0.3j, -0.8 + 0.156j ] )
+    for k, c in enumerate( [ 0.3j, -0.8 + 0.156j ] ):
+        nv.set_f( c, 100 )
+        success = success and np.array_equal( frames[ k ], nv.plane )
+    expected = nv.plane
+    success = success and np.array_equal( nv.renderShared( 2 ), expected ) and np.array_equal( nv.plane, expected )
+    try:
+        nv.progressive( 2 )
+        success = False
+    except ValueError:
+        pass
+
+    message = 'JuliaPlaneNV did not refuse a renderer it cannot use'
+    assert success, message
+
+def test_tile_cache( tmp_path ):
+    """Test that a plane built from cached tiles matches refresh(), and that repeated views are served from the cache"""
+    c = -0.8 + 0.156j
+    expected = jp.JuliaPlane( -2, 2, 50, -1.5, 1.5, 40, c, 60 ).plane
+
+    cache = jp.TileCache( tileSize=16, directory=str( tmp_path ) )
+    first = jp.JuliaPlane( -2, 2, 50, -1.5, 1.5, 40, c, 60, cache=cache )
+    misses = cache.misses
+    second = jp.JuliaPlane( -2, 2, 50, -1.5, 1.5, 40, c, 60, cache=cache )
+
+    success = np.array_equal( first.plane, expected ) and np.array_equal( second.plane, expected )
+    success = success and cache.hits == misses and cache.misses == misses and misses > 0
+
+    #  a small budget only holds a few tiles in memory, but the rest are still found on disk
+    small = jp.TileCache( maxBytes=3000, tileSize=16, directory=str( tmp_path ) )
+    third = jp.JuliaPlane( -2, 2, 50, -1.5, 1.5, 40, c, 60, cache=small )
+    success = success and np.array_equal( third.plane, expected ) and small.bytes <= 3000 and small.diskHits == misses
+
+    #  a window 16 steps along shares every whole tile still in view, though its coordinates differ in the last bit,
+    #  and pan() takes the tiles from the cache too
+    grid = jp.TileCache( tileSize=16 )
+    wide = jp.JuliaPlane( -2, 2, 401, -2, 2, 401, c, 60, cache=grid )
+    tiles = grid.misses
+    shifted = jp.JuliaPlane( -1.84, 2.16, 401, -2, 2, 401, c, 60, cache=grid )
+    success = success and grid.hits >= 24*24 and np.array_equal( shifted.plane, jp.JuliaPlane( -1.84, 2.16, 401, -2, 2, 401, c, 60 ).plane )
+    hits = grid.hits
+    wide.pan( 16, 0 )
+    success = success and grid.hits - hits == tiles and np.array_equal( wide.plane, shifted.plane )
+
+    message = 'the tile cache did not reproduce the plane or did not count its hits and misses'
+    assert success, message
+
+def test_batch():
+    """Test that a batch of constants gives the same frames as setting each constant on the plane in turn"""
+    cs = [ -0.8 + 0.156j, 0.285 + 0.01j, -0.4 + 0.6j ]
+    success = True
+
+    for workers in ( 1, None ):
+        tp = jp.JuliaPlane( -2, 2, 41, -1.5, 1.5, 31, maxLoop=80, workers=workers )
+        frames = tp.batch( cs )
+        success = success and frames.shape == ( 3, 31, 41 ) and frames.dtype == np.int32
+        for k, c in enumerate( cs ):
+            tp.set_f( c, 80 )
+            success = success and np.array_equal( frames[ k ], tp.plane )
+
+    message = 'batch() did not match the planes computed one constant at a time'
+    assert success, message
+
+def test_cycles():
+    """Test that periodicity checking gives exactly the same counts as the plain kernel, inside and outside the set"""
+    c = -0.123 + 0.745j
+    plain = jp.JuliaPlane( -1.5, 1.5, 81, -1.5, 1.5, 81, c, 2000 )
+    checked = jp.JuliaPlane( -1.5, 1.5, 81, -1.5, 1.5, 81, c, 2000, cycles=True )
+
+    success = np.array_equal( plain.plane, checked.plane ) and ( plain.plane == 0 ).any() and ( plain.plane > 1 ).any()
+    success = success and np.array_equal( plain.batch( [ c, 0.3j ] ), checked.batch( [ c, 0.3j ] ) )
+    message = 'periodicity checking changed the counts in the plane'
+    assert success, message
+
+def test_subdivide():
+    """Test the 'subdivide' method:  exact on a plane of one count, and very close to the direct method on a detailed one"""
+    outside = jp.JuliaPlane( 3, 5, 150, 3, 5, 150, method='subdivide' )
+    success = ( outside.plane == 1 ).all()
+
+    c = -0.8 + 0.156j
+    direct = jp.JuliaPlane( -2, 2, 301, -1.5, 1.5, 201, c, 100 )
+    for workers in ( 1, None ):
+        subdivided = jp.JuliaPlane( -2, 2, 301, -1.5, 1.5, 201, c, 100, workers=workers, method='subdivide' )
+        success = success and ( subdivided.plane != direct.plane ).mean() < 0.01 and ( subdivided.plane >= 0 ).all()
+
+    #  zoomed out, the whole set fits inside a border of 1s, which must not be filled in over it
+    direct = jp.JuliaPlane( -50, 50, 200, -50, 50, 200, c, 100 )
+    subdivided = jp.JuliaPlane( -50, 50, 200, -50, 50, 200, c, 100, method='subdivide' )
+    success = success and ( direct.plane != 1 ).any() and np.array_equal( subdivided.plane, direct.plane )
+
+    try:
+        jp.JuliaPlane( method='guess' )
+        success = False
+    except ValueError:
+        pass
+
+    message = "the 'subdivide' method did not reproduce the direct plane closely enough"
+    assert success, message
+
+def test_precision():
+    """Test that the split float64 kernel gives exactly the same counts as the complex kernel, including points
+    with |z| exactly 2, and that the float32 kernel is close"""
+    success = True
+    for c in ( -0.8 + 0.156j, -0.123 + 0.745j ):
+        reference = jp.JuliaPlane( -2, 2, 201, -2, 2, 201, c, 300 )
+        for workers in ( 1, None ):
+            split = jp.JuliaPlane( -2, 2, 201, -2, 2, 201, c, 300, workers=workers, precision='float64' )
+            success = success and np.array_equal( split.plane, reference.plane )
+        single = jp.JuliaPlane( -2, 2, 201, -2, 2, 201, c, 300, precision='float32' )
+        success = success and ( single.plane != reference.plane ).mean() < 0.05
+        success = success and np.array_equal( split.batch( [ c ] )[0], reference.plane )
+
+    message = 'the split real/imaginary kernels did not reproduce the complex kernel'
+    assert success, message
+
+def test_progressive():
+    """Test that progressive rendering yields coarse previews that are samples of the full plane, and ends with the full plane"""
+    c = -0.8 + 0.156j
+    expected = jp.JuliaPlane( -2, 2, 101, -1.5, 1.5, 75, c, 60 ).plane
+    tp = jp.JuliaPlane( -2, 2, 101, -1.5, 1.5, 75, c, 60, deferred=True )
+    seen = []
+
+    success = tp.plane is None
+    for step, preview in tp.progressive( 4, callback=lambda step, preview: seen.append( step ) ):
+        success = success and np.array_equal( preview, expected[ ::step, ::step ] )
+    success = success and seen == [ 8, 4, 2, 1 ] and np.array_equal( tp.plane, expected )
+
+    try:
+        next( tp.progressive( 0 ) )
+        success = False
+    except ValueError:
+        pass
+
+    #  panning a plane that was never computed just computes it at the new window
+    dp = jp.JuliaPlane( -2, 2, 101, -1.5, 1.5, 75, c, 60, deferred=True )
+    dp.pan( 3, 2 )
+    tp.pan( 3, 2 )
+    success = success and np.array_equal( dp.plane, tp.plane )
+
+    message = 'progressive() did not refine to the full plane'
+    assert success, message
+
+def _read_png( filename ):
+    """This private function is for testing to_image only:  it returns the (width, height) from the header of
+    an RGB PNG file written by write_png, and its rows as they were before compression"""
+    import struct
+    import zlib
+    with open( filename, 'rb' ) as pngfile:
+        data = pngfile.read()
+    assert data[ :8 ] == b'\x89PNG\r\n\x1a\n'
+    width, height = struct.unpack( '>II', data[ 16:24 ] )
+    position, compressed = 8, b''
+    while position < len( data ):
+        length, kind = struct.unpack( '>I4s', data[ position:position + 8 ] )
+        if kind == b'IDAT':
+            compressed += data[ position + 8:position + 8 + length ]
+        position += length + 12
+    return ( width, height ), np.frombuffer( zlib.decompress( compressed ), dtype=np.uint8 ).reshape( height, width*3 + 1 )
+
+def test_to_image(tmp_path):
+    """Test that to_image writes a PNG whose pixels are the colormap colours of the counts, with ymax at the top"""
+    tp = jp.JuliaPlane( -2, 2, 97, -1.5, 1.5, 300, -0.8 + 0.156j, 60 )
+    filename = str( tmp_path / 'plane.png' )
+    tp.to_image( filename, 'hot' )
+    size, rows = _read_png( filename )
+
+    success = size == ( 97, 300 )
+    table = jp.colormap_table( 'hot', 60 )
+    success = success and table.shape == ( 61, 3 ) and not table[ 0, 1: ].any() and np.array_equal( table[60], [ 255, 255, 255 ] )
+    success = success and not rows[ :, 0 ].any() and np.array_equal( rows[ :, 1: ].reshape( 300, 97, 3 ), table[ tp.plane ][ ::-1 ] )
+    success = success and np.array_equal( jp.colormap_table( [ [ 0, 0, 0 ], [ 255, 0, 0 ] ], 2 )[ [ 0, 2 ], 0 ], [ 0, 255 ] )
+
+    smooth = jp.JuliaPlane( -2, 2, 97, -1.5, 1.5, 300, -0.8 + 0.156j, 60, output='smooth' )
+    smooth.to_image( filename, 'hot' )
+    size, rows = _read_png( filename )
+    fine = jp.colormap_table( 'hot', 1023 )
+    expected = fine[ np.clip( smooth.plane*( 1023/60. ), 0, 1023 ).astype( np.intp ) ][ ::-1 ]
+    success = success and size == ( 97, 300 ) and np.array_equal( rows[ :, 1: ].reshape( 300, 97, 3 ), expected )
+
+    #  JuliaPlaneNV holds its counts as floats, with ymax already in row 0
+    nv = jp.JuliaPlaneNV( -2, 2, 41, -0.5, 1.5, 23, -0.8 + 0.156j, 60 )
+    nv.to_image( filename, 'hot' )
+    size, rows = _read_png( filename )
+    success = success and size == ( 41, 23 ) and np.array_equal( rows[ :, 1: ].reshape( 23, 41, 3 ), table[ nv.plane.astype( int ) ] )
+
+    message = 'to_image did not write the colormapped plane'
+    assert success, message
+
+def test_smooth():
+    """Test that the smooth output keeps the counts unchanged, stays within one of them, and is 0 inside the set"""
+    c = -0.8 + 0.156j
+    counts = jp.JuliaPlane( -2, 2, 121, -1.5, 1.5, 91, c, 80 ).plane
+    both = jp.JuliaPlane( -2, 2, 121, -1.5, 1.5, 91, c, 80, output='both', modulus=True )
+    smooth = jp.JuliaPlane( -2, 2, 121, -1.5, 1.5, 91, c, 80, workers=None, output='smooth' )
+    escaped = both.modulus > 2
+
+    success = np.array_equal( both.plane, counts ) and both.smooth.dtype == np.float32 and np.array_equal( smooth.plane, both.smooth )
+    success = success and escaped.any() and ( np.abs( both.smooth[ escaped ] - counts[ escaped ] ) <= 1 ).all()
+    success = success and ( both.smooth[ ~escaped ] == 0 ).all() and ( counts[ ~escaped ] == 0 ).all() and smooth.modulus is None
+    reached = np.zeros( ( 31, 41 ), dtype=bool )
+    for i, y in enumerate( np.linspace( -1.5, 1.5, 31 ) ):
+        for j, x in enumerate( np.linspace( -2, 2, 41 ) ):
+            z, loops = complex( x, y ), 0
+            while abs( z ) <= 2 and loops < 20:
+                z = z**2 + c
+                loops += 1
+            reached[ i, j ] = abs( z ) <= 2
+    short = jp.JuliaPlane( -2, 2, 41, -1.5, 1.5, 31, c, 20, output='smooth' ).plane
+    success = success and reached.any() and np.array_equal( short == 0, reached )
+    withModulus = jp.JuliaPlane( -2, 2, 121, -1.5, 1.5, 91, c, 80, modulus=True )
+    success = success and withModulus.plane.dtype == np.int32 and np.array_equal( withModulus.plane, counts )
+    success = success and np.array_equal( withModulus.modulus, both.modulus ) and withModulus.smooth is None
+
+    message = 'the smooth output did not match the escape-time counts'
+    assert success, message
+
+def test_adaptive( monkeypatch ):
+    """Test that adaptive loop counts give exactly the counts of a single pass, and report each round over the
+    whole plane, however many bands it is worked through in"""
+    c = -0.8 + 0.156j
+    success = True
+    for maxLoop in ( 0, 3, 500 ):
+        expected = jp.JuliaPlane( -2, 2, 121, -1.5, 1.5, 91, c, maxLoop ).plane
+        for workers in ( 1, None ):
+            tp = jp.JuliaPlane( -2, 2, 121, -1.5, 1.5, 91, c, maxLoop, workers=workers, adaptive=8 )
+            success = success and np.array_equal( tp.plane, expected )
+    limits = [ limit for limit, iterated, left in tp.rounds ]
+    success = success and limits == [ 8, 16, 32, 64, 128, 256, 500 ] and tp.rounds[0][1] == 121*91
+    success = success and all( tp.rounds[ k ][2] == tp.rounds[ k + 1 ][1] for k in range( len( tp.rounds ) - 1 ) )
+
+    #  in bands of 1000 points the counts and the rounds are the same, and pan() and progressive() keep the
+    #  rounds in step with the whole plane
+    monkeypatch.setattr( jp, '_CHUNK_POINTS', 1000 )
+    banded = jp.JuliaPlane( -2, 2, 121, -1.5, 1.5, 91, c, 500, adaptive=8 )
+    success = success and np.array_equal( banded.plane, expected ) and banded.rounds == tp.rounds
+    banded.pan( 5, -3 )
+    moved = jp.JuliaPlane( banded.xmin, banded.xmax, 121, banded.ymin, banded.ymax, 91, c, 500, adaptive=8 )
+    success = success and np.array_equal( banded.plane, moved.plane ) and banded.rounds == moved.rounds
+    list( moved.progressive( 3 ) )
+    success = success and np.array_equal( moved.plane, banded.plane ) and moved.rounds == banded.rounds
+
+    message = 'the adaptive rounds did not reproduce the single pass counts'
+    assert success, message
+
+def test_chunked_f():
+    """Test that ComplexPlaneNP stores the values of f, the same whatever the blocks and threads used"""
+    f = lambda z: np.abs( np.sin( z ) ) + z.real
+    points = np.linspace( -2, 2, 41 )[np.newaxis, :] + np.linspace( -1, 1, 23 )[:, np.newaxis]*1j
+    success = np.array_equal( jp.ComplexPlaneNP( -2, 2, 41, -1, 1, 23 ).plane, points )
+    for chunkRows, workers in ( ( None, 1 ), ( 5, 1 ), ( 2, 3 ), ( 1, None ) ):
+        tp = jp.ComplexPlaneNP( -2, 2, 41, -1, 1, 23, f, chunkRows=chunkRows, workers=workers )
+        success = success and tp.plane.dtype == np.float64 and np.array_equal( tp.plane, f( points ) )
+
+    message = 'ComplexPlaneNP did not store the values of f'
+    assert success, message
+
+def test_without_numba(tmp_path):
+    """Test that cplane_np imports and computes the same planes when numba cannot be imported"""
+    import subprocess
+    import sys
+    filename = str( tmp_path / 'plane.npy' )
+    script = ( "import sys\n"
+               "sys.modules[ 'numba' ] = None\n"
+               "import numpy as np\n"
+               "import cplane_np as jp\n"
+               "tp = jp.JuliaPlane( -2, 2, 61, -1.5, 1.5, 41, -0.8 + 0.156j, 80, workers=None )\n"
+               "both = jp.JuliaPlane( -2, 2, 61, -1.5, 1.5, 41, -0.8 + 0.156j, 80, output='both' )\n"
+               "assert tp.engine == 'numpy' and np.array_equal( tp.plane, both.plane )\n"
+               "np.save( %r, np.stack( [ tp.plane, jp.julia( -0.8 + 0.156j, 80 )( tp.plane*0 + 0.3j ) ] ) )\n" % filename )
+    result = subprocess.run( [ sys.executable, '-c', script ], cwd=os.path.dirname( os.path.abspath( jp.__file__ ) ), capture_output=True, text=True )
+    expected = jp.JuliaPlane( -2, 2, 61, -1.5, 1.5, 41, -0.8 + 0.156j, 80 ).plane
+
+    success = result.returncode == 0
+    if success:
+        planes = np.load( filename )
+        success = np.array_equal( planes[0], expected ) and ( planes[1] == jp.julia( -0.8 + 0.156j, 80 )( 0.3j ) ).all()
+    success = success and np.array_equal( jp.JuliaPlane( -2, 2, 61, -1.5, 1.5, 41, -0.8 + 0.156j, 80, engine='numpy' ).plane, expected )
+
+    message = 'the plane computed without numba did not match: %s' % result.stderr[ -500: ]
+    assert success, message
+
+def test_kernel_cache(tmp_path):
+    """Test that a second process loads the kernels from numba's on-disk cache instead of compiling them again"""
+    import subprocess
+    import sys
+    script = ( "import cplane_np as jp\n"
+               "jp.JuliaPlane( -2, 2, 21, -2, 2, 21, -0.8 + 0.156j, 50 )\n"
+               "jp.JuliaPlane( -2, 2, 21, -2, 2, 21, -0.8 + 0.156j, 50, cycles=True )\n"
+               "kernels = [ kernel for kernel in vars( jp ).values() if hasattr( getattr( kernel, 'stats', None ), 'cache_misses' ) ]\n"
+               "print( sum( sum( kernel.stats.cache_hits.values() ) for kernel in kernels ), sum( sum( kernel.stats.cache_misses.values() ) for kernel in kernels ) )\n" )
+    environment = dict( os.environ, NUMBA_CACHE_DIR=str( tmp_path ) )
+    run = lambda: subprocess.run( [ sys.executable, '-c', script ], cwd=os.path.dirname( os.path.abspath( jp.__file__ ) ), env=environment, capture_output=True, text=True )
+    runs = [ run(), run() ]
+
+    success = all( result.returncode == 0 for result in runs )
+    if success:
+        hits, misses = [ int( n ) for n in runs[1].stdout.split() ]
+        success = hits > 0 and misses == 0
+    message = 'the second process did not load the kernels from the cache: %s %s' % ( runs[1].stdout, runs[1].stderr[ -500: ] )
+    assert success, message
+
+def test_lazy_imports():
+    """Test that importing cplane_np and computing a plane does not load pandas or matplotlib"""
+    import subprocess
+    import sys
+    script = ( "import sys\n"
+               "import cplane_np as jp\n"
+               "jp.JuliaPlane( -2, 2, 21, -2, 2, 21, -0.8 + 0.156j, 50 )\n"
+               "print( ' '.join( name for name in ( 'pandas', 'matplotlib' ) if name in sys.modules ) )\n" )
+    result = subprocess.run( [ sys.executable, '-c', script ], cwd=os.path.dirname( os.path.abspath( jp.__file__ ) ), capture_output=True, text=True )
+
+    success = result.returncode == 0 and result.stdout.split() == []
+    message = 'computing a plane loaded %s %s' % ( result.stdout, result.stderr[ -500: ] )
+    assert success, message
+
+def test_stats():
+    """Test that the instrumentation tallies the loops and points of a plane exactly, and times its phases"""
+    c = 0.3 + 0.5j
+    rx = np.linspace( -2.5, 2.5, 31 )
+    ry = np.linspace( -2, 2, 21 )
+    iterations = escaped = interior = 0
+    for y in ry:
+        for x in rx:
+            z, loops = complex( x, y ), 0
+            while abs( z ) <= 2 and loops < 40:
+                z = z**2 + c
+                loops += 1
+            iterations += loops
+            interior += abs( z ) <= 2
+            escaped += abs( z ) > 2
+    phases = []
+    tp = jp.JuliaPlane( -2.5, 2.5, 31, -2, 2, 21, c, 40, stats=jp.RenderStats( [ lambda name, seconds, stats: phases.append( name ) ] ) )
+    tp.frame
+
+    success = ( tp.stats.iterations, tp.stats.escaped, tp.stats.interior, tp.stats.points ) == ( iterations, escaped, interior, 31*21 )
+    success = success and set( phases ) - { 'compile', 'kernel' } == { 'grid', 'tally', 'labels', 'frame' } and tp.stats.toDict()[ 'refreshes' ] == 1
+    success = success and jp.JuliaPlane( -2.5, 2.5, 31, -2, 2, 21, c, 40 ).stats is None
+    success = success and json.loads( json.dumps( tp.stats.toDict() ) )[ 'iterations' ] == iterations
+
+    message = 'the stats did not match the plane: %s' % tp.stats.toDict()
+    assert success, message
+
+def test_render_shared( monkeypatch ):
+    """Test that rendering across worker processes into shared memory gives the same plane as refresh(), and
+    that a render that fails releases its shared block"""
+    c = -0.835 - 0.2321j
+    expected = jp.JuliaPlane( -1.5, 1.5, 90, -1, 1, 61, c, 200 ).plane
+    tp = jp.JuliaPlane( -1.5, 1.5, 90, -1, 1, 61, c, 200, deferred=True )
+    plane = tp.renderShared( 2, bandRows=7 )
+
+    success = plane is tp.plane and np.array_equal( plane, expected ) and not plane.flags.owndata
+    try:
+        jp.JuliaPlane( -1.5, 1.5, 9, -1, 1, 6, c, 20, method='subdivide' ).renderShared( 2 )
+        success = False
+    except ValueError:
+        pass
+
+    blocks = []
+    create = jp.shared_memory.SharedMemory
+    monkeypatch.setattr( jp.shared_memory, 'SharedMemory', lambda **options: blocks.append( create( **options ) ) or blocks[-1] )
+    tp.c = 'not a number'
+    try:
+        tp.renderShared( 2 )
+        success = False
+    except ValueError:
+        success = success and blocks[0].buf is None
+
+    message = 'renderShared() did not reproduce the plane'
+    assert success, message
+
+def test_schedule():
+    """Test that the dynamic and balanced schedules give the same plane as the static one, most costly rows first"""
+    c = -0.835 - 0.2321j
+    expected = jp.JuliaPlane( -1.6, 1.6, 64, -1.2, 1.2, 50, c, 300 ).plane
+    success = True
+    for schedule in ( 'static', 'dynamic', 'balanced' ):
+        for cycles in ( False, True ):
+            tp = jp.JuliaPlane( -1.6, 1.6, 64, -1.2, 1.2, 50, c, 300, workers=2, cycles=cycles, schedule=schedule )
+            success = success and np.array_equal( tp.plane, expected )
+    order = jp._row_order( np.linspace( -1.6, 1.6, 64 ), np.linspace( -1.2, 1.2, 50 ), c, 300 )
+    cost = np.where( expected == 0, 300, expected + 1 ).sum( axis=1 )
+    success = success and sorted( order ) == list( range( 50 ) ) and cost[ order[0] ] > np.median( cost )
+    try:
+        jp.JuliaPlane( -1.6, 1.6, 8, -1.2, 1.2, 8, c, 30, precision='float32', schedule='balanced' )
+        success = False
+    except ValueError:
+        pass
+
+    message = 'the scheduled refresh did not reproduce the plane'
+    assert success, message
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import asyncio
+import concurrent.futures
+import numpy as np
+import julia_server as js
+
+"""This file contains the unit test functions for the tile server in julia_server.py"""
+
+
+def test_tile_window():
+    """Test that the tiles at a zoom level cover the world square from the top left, without gaps"""
+    success = js.tile_window( 0, 0, 0 ) == ( -2., 2., -2., 2. )
+    success = success and js.tile_window( 1, 0, 0 ) == ( -2., 0., 0., 2. )
+    success = success and js.tile_window( 1, 1, 1 ) == ( 0., 2., -2., 0. )
+
+    message = 'tile_window() did not give the expected windows'
+    assert success, message
+
+
+def _get(port, target):
+    """Make one request to the server on port and return the status, headers and body of the reply."""
+    async def fetch():
+        reader, writer = await asyncio.open_connection( '127.0.0.1', port )
+        writer.write( ( 'GET %s HTTP/1.1\r\nConnection: close\r\n\r\n' % target ).encode( 'latin-1' ) )
+        reply = await reader.read()
+        writer.close()
+        return reply
+    return fetch()
+
+
+def test_server():
+    """Test that the server returns raw and PNG tiles matching the plane, coalesces duplicate requests, and rejects bad ones"""
+    async def run():
+        server = js.TileServer( executor=concurrent.futures.ThreadPoolExecutor( 2 ) )
+        listener = await server.start( '127.0.0.1', 0 )
+        port = listener.sockets[0].getsockname()[1]
+        target = '/tiles/1/0/1.raw?cr=-0.8&ci=0.156&max=50&size=32'
+        replies = await asyncio.gather( _get( port, target ), _get( port, target ), _get( port, target.replace( 'raw', 'png' ) ),
+                                        _get( port, '/tiles/1/2/0.png' ), _get( port, '/nothing' ) )
+        listener.close()
+        await listener.wait_closed()
+        return server, replies
+
+    server, replies = asyncio.run( run() )
+    heads = [ reply.split( b'\r\n' )[0] for reply in replies ]
+    body = replies[0].split( b'\r\n\r\n', 1 )[1]
+    counts = np.frombuffer( body, dtype='<i4' ).reshape( 32, 32 )
+    expected = js.render_tile( -0.8, 0.156, 50, 1, 0, 1, 32 )
+
+    success = heads == [ b'HTTP/1.1 200 OK' ]*3 + [ b'HTTP/1.1 400 Bad Request', b'HTTP/1.1 404 Not Found' ]
+    success = success and np.array_equal( counts, expected ) and replies[2].split( b'\r\n\r\n', 1 )[1][ :8 ] == b'\x89PNG\r\n\x1a\n'
+    success = success and server.rendered == 1 and server.coalesced + server.cache.hits == 2
+
+    message = 'the tile server did not answer the requests as expected: %s' % heads
+    assert success, message
+
+
+def test_local_only():
+    """Test that the server refuses to listen anywhere but the local machine"""
+    try:
+        asyncio.run( js.TileServer( executor=concurrent.futures.ThreadPoolExecutor( 1 ) ).start( '0.0.0.0', 0 ) )
+        success = False
+    except ValueError:
+        success = True
+
+    message = 'the tile server agreed to listen on every interface'
+    assert success, message
+
+
+def test_errors(monkeypatch):
+    """Test that a tile too small to have a grid step is refused, and that a render that fails is answered with a 500"""
+    def fail(*args):
+        raise RuntimeError( 'render failed' )
+
+    async def run():
+        server = js.TileServer( executor=concurrent.futures.ThreadPoolExecutor( 1 ) )
+        listener = await server.start( '127.0.0.1', 0 )
+        port = listener.sockets[0].getsockname()[1]
+        small = await _get( port, '/tiles/0/0/0.raw?size=1' )
+        monkeypatch.setattr( js, 'render_tile', fail )
+        failed = await _get( port, '/tiles/0/0/0.raw?size=8' )
+        listener.close()
+        await listener.wait_closed()
+        return small, failed
+
+    small, failed = asyncio.run( run() )
+    success = small.startswith( b'HTTP/1.1 400 Bad Request' ) and failed.startswith( b'HTTP/1.1 500 Internal Server Error' )
+
+    message = 'the server did not answer the bad requests: %r %r' % ( small[ :40 ], failed[ :40 ] )
+    assert success, message
+
+
+class _Writer(object):
+    """This private class is for testing handle() only:  it stands in for a connection's StreamWriter and records being closed"""
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+def test_shutdown():
+    """Test that a connection cancelled at shutdown is closed and ends cancelled, and that close() shuts the executor down"""
+    server = js.TileServer( executor=concurrent.futures.ThreadPoolExecutor( 1 ) )
+    writer = _Writer()
+
+    async def run():
+        #  a client that has connected but not sent anything yet
+        task = asyncio.ensure_future( server.handle( asyncio.StreamReader(), writer ) )
+        await asyncio.sleep( 0 )
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        return task.cancelled()
+
+    success = asyncio.run( run() ) and writer.closed and not server.connections
+    server.close()
+    try:
+        server.executor.submit( int )
+        success = False
+    except RuntimeError:
+        pass
+
+    message = 'the server did not pass on the cancellation or shut its executor down'
+    assert success, message